@@ -0,0 +1,203 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import bisect
+from status import *
+from frame import *
+from instruction import *
+
+"""
+Analyzer objects infer the possible types of the global variables at every instruction.
+The instructions are split into basic blocks of a control flow graph and the types are propagated
+along its edges until nothing changes. A type is a bit mask of the type tags and UNDEFINED.
+"""
+
+# the variable is not defined by DEFVAR yet
+UNDEFINED = 1 << 5
+
+# masks of the type tags
+SET = (1 << INT) | (1 << BOOL) | (1 << STRING) | (1 << NIL)
+ANY = SET | (1 << UNSET) | UNDEFINED
+
+
+class Analyzer:
+    ENDS = frozenset(
+        ("JUMP", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS", "CALL", "RETURN", "EXIT")
+    )  # end blocks
+    READS_FIRST = frozenset(("WRITE", "PUSHS", "EXIT", "DPRINT"))  # opcodes reading their var
+
+    # types of the operands required by the instructions, a successful instruction proves them
+    REQUIRED = {
+        "MOVE": (None, SET, None),
+        "PUSHS": (SET, None, None),
+        "WRITE": (SET, None, None),
+        "EXIT": (1 << INT, None, None),
+        "ADD": (None, 1 << INT, 1 << INT),
+        "SUB": (None, 1 << INT, 1 << INT),
+        "MUL": (None, 1 << INT, 1 << INT),
+        "IDIV": (None, 1 << INT, 1 << INT),
+        "LT": (None, SET, SET),
+        "GT": (None, SET, SET),
+        "EQ": (None, SET, SET),
+        "AND": (None, 1 << BOOL, 1 << BOOL),
+        "OR": (None, 1 << BOOL, 1 << BOOL),
+        "NOT": (None, 1 << BOOL, None),
+        "INT2CHAR": (None, 1 << INT, None),
+        "STRI2INT": (None, 1 << STRING, 1 << INT),
+        "CONCAT": (None, 1 << STRING, 1 << STRING),
+        "STRLEN": (None, 1 << STRING, None),
+        "GETCHAR": (None, 1 << STRING, 1 << INT),
+        "SETCHAR": (1 << STRING, 1 << INT, 1 << STRING),
+        "TYPE": (None, ANY & ~UNDEFINED, None),
+        "JUMPIFEQ": (None, SET, SET),
+        "JUMPIFNEQ": (None, SET, SET),
+    }
+
+    # types of the results written to the first operand
+    RESULTS = {
+        "ADD": 1 << INT,
+        "SUB": 1 << INT,
+        "MUL": 1 << INT,
+        "IDIV": 1 << INT,
+        "LT": 1 << BOOL,
+        "GT": 1 << BOOL,
+        "EQ": 1 << BOOL,
+        "AND": 1 << BOOL,
+        "OR": 1 << BOOL,
+        "NOT": 1 << BOOL,
+        "INT2CHAR": 1 << STRING,
+        "STRI2INT": 1 << INT,
+        "CONCAT": 1 << STRING,
+        "STRLEN": 1 << INT,
+        "GETCHAR": 1 << STRING,
+        "SETCHAR": 1 << STRING,
+        "TYPE": 1 << STRING,
+        "POPS": SET,
+    }
+
+    # types read by READ, missing or invalid input is nil
+    READ_RESULTS = {"int": 1 << INT, "bool": 1 << BOOL, "string": 1 << STRING}
+
+    def __init__(self, program):
+        self.program = program  # program being analyzed
+        self.leaders = []  # indices of the first instructions of the basic blocks
+        self.entries = {}  # maps the reachable leaders to the types at their start
+
+    # propagates the types through the control flow graph
+    def analyze(self):
+        instructions = self.program.instructions
+        self.leaders = self._leaders()
+        returns = [
+            instruction.index + 1
+            for instruction in instructions
+            if instruction.opcode == "CALL"
+        ]
+
+        if not instructions:
+            return
+
+        self.entries = {0: [UNDEFINED] * len(self.program.global_slots)}
+        pending = [0]
+        while pending:
+            leader = pending.pop()
+            types = list(self.entries[leader])
+            last = self._block_end(leader)
+            for index in range(leader, last + 1):
+                self.transfer(instructions[index], types)
+
+            for successor in self._successors(instructions[last], returns):
+                if successor >= len(instructions):
+                    continue
+                entry = self.entries.get(successor)
+                if entry is None:
+                    self.entries[successor] = list(types)
+                    pending.append(successor)
+                    continue
+
+                # the types of the paths joining here are united
+                changed = False
+                for slot, var_types in enumerate(types):
+                    if entry[slot] | var_types != entry[slot]:
+                        entry[slot] |= var_types
+                        changed = True
+                if changed:
+                    pending.append(successor)
+
+    # yields the reachable instructions with the types of the variables before them
+    def states(self):
+        instructions = self.program.instructions
+        for leader in sorted(self.entries):
+            types = list(self.entries[leader])
+            for index in range(leader, self._block_end(leader) + 1):
+                yield instructions[index], types
+                self.transfer(instructions[index], types)
+
+    # returns the types of a symbol, the types of a variable of another frame are unknown
+    def operand_types(self, op, op_type, types):
+        if op_type in LITERAL_TYPES:
+            return 1 << op.type
+        if op_type == "var" and op[0] == GLOBAL:
+            return types[op[1]]
+        return ANY
+
+    # changes the types to the ones after the instruction executed successfully
+    def transfer(self, instruction, types):
+        opcode = instruction.opcode
+        required = self.REQUIRED.get(opcode, (None, None, None))
+        operands = (
+            (instruction.op1, instruction.op1_type, required[0]),
+            (instruction.op2, instruction.op2_type, required[1]),
+            (instruction.op3, instruction.op3_type, required[2]),
+        )
+        for op, op_type, op_required in operands:
+            if op_type == "var" and op[0] == GLOBAL and op_required is not None:
+                types[op[1]] &= op_required
+
+        if instruction.op1_type != "var" or instruction.op1[0] != GLOBAL:
+            return
+        slot = instruction.op1[1]
+
+        if opcode == "DEFVAR":
+            types[slot] = 1 << UNSET
+        elif opcode == "MOVE":
+            types[slot] = self.operand_types(instruction.op2, instruction.op2_type, types) & SET
+        elif opcode == "READ":
+            types[slot] = self.READ_RESULTS[instruction.op2] | (1 << NIL)
+        elif opcode in self.RESULTS:
+            types[slot] = self.RESULTS[opcode]
+        elif opcode not in self.READS_FIRST:
+            types[slot] &= ~UNDEFINED
+
+    # returns the sorted indices of the first instructions of the basic blocks
+    def _leaders(self):
+        instructions = self.program.instructions
+        leaders = {0}
+        leaders.update(self.program.labels.values())
+        for instruction in instructions:
+            if instruction.opcode in self.ENDS:
+                leaders.add(instruction.index + 1)
+        return sorted(leader for leader in leaders if leader < len(instructions))
+
+    # returns the index of the last instruction of the block starting at the leader
+    def _block_end(self, leader):
+        position = bisect.bisect_right(self.leaders, leader)
+        if position < len(self.leaders):
+            return self.leaders[position] - 1
+        return len(self.program.instructions) - 1
+
+    # returns the leaders of the blocks following the last instruction of a block
+    def _successors(self, instruction, returns):
+        opcode = instruction.opcode
+        if opcode == "JUMP" or opcode == "CALL":
+            # a call continues at the next instruction only through RETURN
+            return [instruction.target]
+        if opcode in ("JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS"):
+            return [instruction.target, instruction.index + 1]
+        if opcode == "RETURN":
+            return returns
+        if opcode == "EXIT":
+            return []
+        return [instruction.index + 1]
@@ -0,0 +1,288 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import os
+import random
+from xml.sax.saxutils import escape
+
+"""
+Generator objects write the XML programs of the benchmark workloads.
+Every workload is a typical shape of IPPcode23 code and its size is multiplied by the scale.
+Each program is also written as a load variant, which starts with EXIT, so running it
+measures only the start of the interpreter and the loading of the program.
+"""
+
+
+class Generator:
+    # default sizes of the workloads
+    SIZES = {
+        "loop": 200000,
+        "strings": 10000,
+        "recursion": 5000,
+        "stack": 100000,
+        "expression": 100000,
+        "read": 50000,
+        "sparse": 100000,
+    }
+
+    # opcodes whose first operand is a label
+    LABEL_OPCODES = frozenset(
+        ("LABEL", "JUMP", "CALL", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+    )
+
+    def __init__(self, directory, scale=1.0, seed=0):
+        self.directory = directory  # directory of the generated files
+        self.scale = scale  # multiplier of the default sizes
+        self.random = random.Random(seed)  # the programs do not change between runs
+
+    # writes the program, its load variant and its input, returns the paths of the files
+    def generate(self, name):
+        size = max(1, int(self.SIZES[name] * self.scale))
+        lines, inputs = getattr(self, "_" + name)(size)
+        instructions = [line.split() for line in lines]
+        orders = list(range(2, len(instructions) + 2))
+        shuffle = False
+        if name == "sparse":
+            # the orders have large holes and the elements are not sorted
+            orders = []
+            order = 1
+            for _ in instructions:
+                order += self.random.randint(1, 1000)
+                orders.append(order)
+            shuffle = True
+
+        source = os.path.join(self.directory, name + ".xml")
+        load = os.path.join(self.directory, name + ".load.xml")
+        input_file = os.path.join(self.directory, name + ".in")
+        self._write(source, instructions, orders, shuffle)
+
+        # the order 1 is free, so EXIT is the first instruction of the load variant
+        self._write(load, [["EXIT", "int@0"]] + instructions, [1] + orders, shuffle)
+
+        with open(input_file, "w") as f:
+            f.writelines(line + "\n" for line in inputs)
+        return source, load, input_file
+
+    # writes the instructions with their orders as XML
+    def _write(self, file, instructions, orders, shuffle):
+        elements = list(zip(orders, instructions))
+        if shuffle:
+            self.random.shuffle(elements)
+
+        with open(file, "w") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<program language="IPPcode23">\n')
+            for order, (opcode, *operands) in elements:
+                f.write(f'  <instruction order="{order}" opcode="{opcode}">\n')
+                for position, operand in enumerate(operands, 1):
+                    op_type, value = self._operand(opcode, position, operand)
+                    f.write(f'    <arg{position} type="{op_type}">{escape(value)}</arg{position}>\n')
+                f.write("  </instruction>\n")
+            f.write("</program>\n")
+
+    # returns the type and the value of an operand written as IPPcode23 text
+    def _operand(self, opcode, position, operand):
+        if position == 1 and opcode in self.LABEL_OPCODES:
+            return "label", operand
+        if opcode == "READ" and position == 2:
+            return "type", operand
+        if operand[:3] in ("GF@", "LF@", "TF@"):
+            return "var", operand
+        return tuple(operand.split("@", 1))
+
+    # tight loop of integer arithmetic and a conditional jump
+    def _loop(self, size):
+        lines = [
+            "DEFVAR GF@i",
+            "MOVE GF@i int@0",
+            "DEFVAR GF@sum",
+            "MOVE GF@sum int@0",
+            "DEFVAR GF@cond",
+            "LABEL loop",
+            "ADD GF@sum GF@sum GF@i",
+            "MUL GF@cond GF@i int@3",
+            "IDIV GF@cond GF@cond int@2",
+            "SUB GF@sum GF@sum GF@cond",
+            "ADD GF@i GF@i int@1",
+            f"LT GF@cond GF@i int@{size}",
+            "JUMPIFEQ loop GF@cond bool@true",
+            "WRITE GF@sum",
+        ]
+        return lines, []
+
+    # builds a string by CONCAT, then reads it by GETCHAR and rewrites it by SETCHAR
+    def _strings(self, size):
+        lines = [
+            "DEFVAR GF@letters",
+            "MOVE GF@letters string@abcdefghijklmnopqrstuvwxyz",
+            "DEFVAR GF@text",
+            "MOVE GF@text string@",
+            "DEFVAR GF@i",
+            "MOVE GF@i int@0",
+            "DEFVAR GF@j",
+            "DEFVAR GF@char",
+            "DEFVAR GF@cond",
+            "LABEL build",
+            "IDIV GF@j GF@i int@26",
+            "MUL GF@j GF@j int@26",
+            "SUB GF@j GF@i GF@j",
+            "GETCHAR GF@char GF@letters GF@j",
+            "CONCAT GF@text GF@text GF@char",
+            "ADD GF@i GF@i int@1",
+            f"LT GF@cond GF@i int@{size}",
+            "JUMPIFEQ build GF@cond bool@true",
+            "MOVE GF@i int@0",
+            f"MOVE GF@j int@{size - 1}",
+            "LABEL reverse",
+            "GETCHAR GF@char GF@text GF@j",
+            "SETCHAR GF@text GF@i GF@char",
+            "ADD GF@i GF@i int@1",
+            "SUB GF@j GF@j int@1",
+            f"LT GF@cond GF@i int@{size}",
+            "JUMPIFEQ reverse GF@cond bool@true",
+            "STRLEN GF@i GF@text",
+            "WRITE GF@i",
+            "WRITE GF@text",
+        ]
+        return lines, []
+
+    # repeated deep recursion summing the numbers down to zero
+    def _recursion(self, size):
+        lines = [
+            "DEFVAR GF@result",
+            "DEFVAR GF@round",
+            "MOVE GF@round int@0",
+            "DEFVAR GF@cond",
+            "LABEL main",
+            "CREATEFRAME",
+            "DEFVAR TF@n",
+            f"MOVE TF@n int@{size}",
+            "CALL sum",
+            "POPS GF@result",
+            "ADD GF@round GF@round int@1",
+            "LT GF@cond GF@round int@10",
+            "JUMPIFEQ main GF@cond bool@true",
+            "WRITE GF@result",
+            "JUMP end",
+            "LABEL sum",
+            "PUSHFRAME",
+            "DEFVAR LF@result",
+            "JUMPIFNEQ recurse LF@n int@0",
+            "PUSHS int@0",
+            "POPFRAME",
+            "RETURN",
+            "LABEL recurse",
+            "CREATEFRAME",
+            "DEFVAR TF@n",
+            "SUB TF@n LF@n int@1",
+            "CALL sum",
+            "POPS LF@result",
+            "ADD LF@result LF@result LF@n",
+            "PUSHS LF@result",
+            "POPFRAME",
+            "RETURN",
+            "LABEL end",
+        ]
+        return lines, []
+
+    # pushes many values to the data stack and pops them again
+    def _stack(self, size):
+        lines = [
+            "DEFVAR GF@i",
+            "MOVE GF@i int@0",
+            "DEFVAR GF@a",
+            "DEFVAR GF@b",
+            "DEFVAR GF@sum",
+            "MOVE GF@sum int@0",
+            "DEFVAR GF@cond",
+            "LABEL push",
+            "PUSHS GF@i",
+            "PUSHS int@1",
+            "POPS GF@a",
+            "ADD GF@i GF@i GF@a",
+            "PUSHS GF@i",
+            f"LT GF@cond GF@i int@{size}",
+            "JUMPIFEQ push GF@cond bool@true",
+            "LABEL pop",
+            "POPS GF@a",
+            "POPS GF@b",
+            "ADD GF@sum GF@sum GF@a",
+            "ADD GF@sum GF@sum GF@b",
+            "SUB GF@i GF@i int@1",
+            "LT GF@cond GF@i int@1",
+            "JUMPIFEQ pop GF@cond bool@false",
+            "WRITE GF@sum",
+        ]
+        return lines, []
+
+    # evaluates arithmetic expressions on the data stack by the stack instructions
+    def _expression(self, size):
+        lines = [
+            "DEFVAR GF@i",
+            "MOVE GF@i int@0",
+            "PUSHS int@0",
+            "LABEL loop",
+            "PUSHS GF@i",
+            "ADDS",
+            "PUSHS GF@i",
+            "PUSHS int@3",
+            "MULS",
+            "PUSHS int@2",
+            "IDIVS",
+            "SUBS",
+            "PUSHS GF@i",
+            "PUSHS int@1",
+            "ADDS",
+            "POPS GF@i",
+            "PUSHS GF@i",
+            f"PUSHS int@{size}",
+            "LTS",
+            "PUSHS bool@true",
+            "JUMPIFEQS loop",
+            "POPS GF@i",
+            "WRITE GF@i",
+        ]
+        return lines, []
+
+    # reads pairs of an integer and a string until the input ends
+    def _read(self, size):
+        lines = [
+            "DEFVAR GF@number",
+            "DEFVAR GF@word",
+            "DEFVAR GF@type",
+            "DEFVAR GF@sum",
+            "MOVE GF@sum int@0",
+            "DEFVAR GF@length",
+            "MOVE GF@length int@0",
+            "DEFVAR GF@size",
+            "LABEL loop",
+            "READ GF@number int",
+            "TYPE GF@type GF@number",
+            "JUMPIFEQ end GF@type string@nil",
+            "READ GF@word string",
+            "ADD GF@sum GF@sum GF@number",
+            "STRLEN GF@size GF@word",
+            "ADD GF@length GF@length GF@size",
+            "JUMP loop",
+            "LABEL end",
+            "WRITE GF@sum",
+            "WRITE GF@length",
+        ]
+        inputs = []
+        for i in range(size):
+            inputs.append(str(self.random.randint(-1000, 1000)))
+            inputs.append("word" * self.random.randint(1, 8))
+        return lines, inputs
+
+    # large straight-line program, which is mostly loaded and validated
+    def _sparse(self, size):
+        count = max(1, size // 4)
+        lines = [f"DEFVAR GF@v{i}" for i in range(count)]
+        lines += [f"MOVE GF@v{i} int@{i}" for i in range(count)]
+        for i in range(size - 3 * count):
+            lines.append(f"ADD GF@v{i % count} GF@v{i % count} GF@v{(i * 7) % count}")
+        lines += [f"WRITE GF@v{i}" for i in range(count)]
+        return lines, []
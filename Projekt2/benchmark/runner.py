@@ -0,0 +1,225 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import argparse
+import io
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tarfile
+import tempfile
+from generator import *
+
+"""
+Runner objects run the benchmark workloads by one or two revisions of interpret.py.
+Every run is a separate process, its wall time and peak resident memory are measured,
+and the time of its load variant is the time of starting the interpreter and loading the program.
+The number of executed instructions is counted once by the profiler of the current revision.
+"""
+
+# directory of interpret.py of the current revision
+PROJECT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs the command and prints its time and peak memory, the command is started by a small
+# process, because a child inherits the peak memory of the process it was forked from
+MEASURE = """
+import resource, subprocess, sys, time
+start = time.perf_counter()
+code = subprocess.call(sys.argv[1:], stdout=subprocess.DEVNULL)
+seconds = time.perf_counter() - start
+print(seconds, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+sys.exit(code)
+"""
+
+
+class Runner:
+    def __init__(self, directory, repeat=3, interpreter_args=()):
+        self.directory = directory  # directory of the generated workloads
+        self.repeat = repeat  # runs of each workload, the fastest one is reported
+        self.interpreter_args = list(interpreter_args)  # extra arguments of interpret.py
+
+    # counts the instructions executed by the workload
+    def count(self, source, input_file):
+        report = os.path.join(self.directory, "profile.json")
+        command = [
+            sys.executable,
+            os.path.join(PROJECT, "interpret.py"),
+            "--source",
+            source,
+            "--input",
+            input_file,
+            "--profile",
+            report,
+            "--profile-top",
+            "0",
+        ]
+        self._run(command, quiet=True)
+        with open(report) as f:
+            return json.load(f)["instructions"]
+
+    # measures the workload run by the interpreter, returns its time, load time and peak memory
+    def measure(self, interpreter, files, instructions):
+        source, load, input_file = files
+        times = []
+        loads = []
+        memory = 0
+        for _ in range(self.repeat):
+            seconds, rss = self._run(self._command(interpreter, source, input_file))
+            times.append(seconds)
+            memory = max(memory, rss)
+            loads.append(self._run(self._command(interpreter, load, input_file))[0])
+
+        seconds = min(times)
+        load_seconds = min(loads)
+        run_seconds = max(seconds - load_seconds, 1e-6)
+        return {
+            "time": seconds,
+            "load": load_seconds,
+            "instructions_per_second": instructions / run_seconds,
+            "peak_rss": memory,
+        }
+
+    # returns the command running the interpreter
+    def _command(self, interpreter, source, input_file):
+        return (
+            [sys.executable, interpreter, "--source", source, "--input", input_file]
+            + self.interpreter_args
+        )
+
+    # runs the command, returns its wall time and peak resident memory in bytes
+    def _run(self, command, quiet=False):
+        stderr = subprocess.DEVNULL if quiet else None
+        process = subprocess.run(
+            [sys.executable, "-c", MEASURE] + command,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+        )
+        if process.returncode != 0:
+            sys.exit(f"{shlex.join(command)} failed with the exit code {process.returncode}.")
+
+        # the maximum resident set size is in kilobytes on Linux
+        seconds, memory = process.stdout.split()
+        return float(seconds), int(memory) * 1024
+
+
+# returns the path of interpret.py of a file, a directory or a git revision
+def resolve(baseline, directory):
+    if os.path.isfile(baseline):
+        return baseline
+    if os.path.isdir(baseline):
+        return os.path.join(baseline, "interpret.py")
+
+    # git archive run in the project directory extracts only this directory of the revision
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", baseline],
+        cwd=PROJECT,
+        capture_output=True,
+    )
+    if archive.returncode != 0:
+        sys.exit(f"Unable to read the revision {baseline}: {archive.stderr.decode().strip()}")
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(os.path.join(directory, "baseline"))
+    return os.path.join(directory, "baseline", "interpret.py")
+
+
+# prints the table of the results
+def print_results(results, compared):
+    header = f"{'workload':<10} {'instr':>9} {'time [s]':>9} {'load [s]':>9} {'instr/s':>11} {'RSS [MB]':>9}"
+    if compared:
+        header += f" {'base [s]':>9} {'change':>8}"
+    print(header)
+    for result in results:
+        current = result["current"]
+        line = (
+            f"{result['workload']:<10} {result['instructions']:>9} {current['time']:>9.3f} "
+            f"{current['load']:>9.3f} {current['instructions_per_second']:>11.0f} "
+            f"{current['peak_rss'] / (1 << 20):>9.1f}"
+        )
+        if compared:
+            line += f" {result['baseline']['time']:>9.3f} {100 * result['change']:>+7.1f}%"
+        print(line)
+
+
+def main():
+    # parse arguments
+    parser = argparse.ArgumentParser(description="Benchmark of the IPPcode23 interpreter.")
+    parser.add_argument(
+        "--workload",
+        action="append",
+        choices=sorted(Generator.SIZES),
+        help="Workload to run, all of them by default, may be repeated.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier of the sizes of the workloads."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs of each workload, the fastest one is reported."
+    )
+    parser.add_argument(
+        "--interpreter",
+        default=os.path.join(PROJECT, "interpret.py"),
+        help="interpret.py to measure, the current revision by default.",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="interpret.py, its directory or a git revision to compare with.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Fail if a workload is slower than the baseline by more than this percentage.",
+    )
+    parser.add_argument(
+        "--args", default="", help="Extra arguments of interpret.py, for example --optimize."
+    )
+    parser.add_argument("--json", help="File for the results in JSON format.")
+    parser.add_argument("--keep", help="Directory for the generated workloads, kept after the run.")
+    args = vars(parser.parse_args())
+
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = args["keep"] or temporary
+        os.makedirs(directory, exist_ok=True)
+        generator = Generator(directory, args["scale"])
+        runner = Runner(directory, args["repeat"], shlex.split(args["args"]))
+        baseline = None
+        if args["baseline"] is not None:
+            baseline = resolve(args["baseline"], temporary)
+
+        results = []
+        for name in args["workload"] or sorted(Generator.SIZES):
+            files = generator.generate(name)
+            instructions = runner.count(files[0], files[2])
+            result = {
+                "workload": name,
+                "instructions": instructions,
+                "current": runner.measure(args["interpreter"], files, instructions),
+            }
+            if baseline is not None:
+                result["baseline"] = runner.measure(baseline, files, instructions)
+                result["change"] = result["current"]["time"] / result["baseline"]["time"] - 1
+            results.append(result)
+
+    print_results(results, baseline is not None)
+    if args["json"] is not None:
+        with open(args["json"], "w") as f:
+            json.dump(results, f, indent=2)
+
+    # a regression fails the run, so it can stop a deployment
+    if baseline is not None and args["threshold"] is not None:
+        slower = [
+            result["workload"]
+            for result in results
+            if 100 * result["change"] > args["threshold"]
+        ]
+        if slower:
+            sys.exit(f"Slower than the baseline: {', '.join(slower)}.")
+
+
+if __name__ == "__main__":
+    main()
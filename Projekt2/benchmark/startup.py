@@ -0,0 +1,146 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import argparse
+import compileall
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from runner import PROJECT, resolve
+
+"""
+Startup objects measure the time from starting interpret.py to its first instruction.
+The program has a single instruction, so the wall time of a run is the startup of the interpreter,
+and the time of starting Python without any module is measured as well for comparison.
+The imports are measured by python -X importtime and the slowest ones are reported.
+"""
+
+# the smallest program, which writes a single character
+PROGRAM = """<?xml version="1.0" encoding="UTF-8"?>
+<program language="IPPcode23">
+  <instruction order="1" opcode="WRITE">
+    <arg1 type="string">x</arg1>
+  </instruction>
+</program>
+"""
+
+
+class Startup:
+    TOP = 10  # number of the slowest imports reported
+
+    def __init__(self, directory, repeat=20, interpreter_args=()):
+        self.repeat = repeat  # runs of each measurement, the median is reported
+        self.interpreter_args = list(interpreter_args)  # extra arguments of interpret.py
+        self.source = os.path.join(directory, "startup.xml")
+        self.input = os.path.join(directory, "startup.in")
+        with open(self.source, "w") as f:
+            f.write(PROGRAM)
+        open(self.input, "w").close()
+
+    # returns the median wall time of the command in seconds
+    def _time(self, command):
+        times = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    # returns the command running the interpreter
+    def _command(self, interpreter, *options):
+        return (
+            [sys.executable, *options, interpreter, "--source", self.source, "--input", self.input]
+            + self.interpreter_args
+        )
+
+    # returns the self and cumulative import times of the modules in seconds
+    def imports(self, interpreter):
+        process = subprocess.run(
+            self._command(interpreter, "-X", "importtime"),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        modules = []
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:") :].split("|")
+            # nested imports are indented, the top level ones are not
+            top_level = not name[1:].startswith(" ")
+            modules.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6, top_level))
+        return modules
+
+    # measures the interpreter, returns its startup, the startup of Python and the imports
+    def measure(self, interpreter):
+        # the modules are compiled first, so the startup does not include compiling them
+        compileall.compile_dir(os.path.dirname(os.path.abspath(interpreter)), quiet=1)
+        modules = self.imports(interpreter)
+        return {
+            "startup": self._time(self._command(interpreter)),
+            "python": self._time([sys.executable, "-c", "pass"]),
+            "imports": sum(own for _, own, _, _ in modules),
+            "modules": len(modules),
+            "slowest": sorted(
+                (
+                    {"module": name, "time": cumulative}
+                    for name, _, cumulative, top_level in modules
+                    if top_level
+                ),
+                key=lambda module: module["time"],
+                reverse=True,
+            )[: self.TOP],
+        }
+
+
+# prints the results of a measurement
+def print_startup(title, result):
+    print(f"{title}:")
+    print(f"  time to the first instruction {1000 * result['startup']:8.1f} ms")
+    print(f"  python without modules        {1000 * result['python']:8.1f} ms")
+    print(f"  imports of {result['modules']:3} modules        {1000 * result['imports']:8.1f} ms")
+    for module in result["slowest"]:
+        print(f"    {module['module']:<26} {1000 * module['time']:8.1f} ms")
+
+
+def main():
+    # parse arguments
+    parser = argparse.ArgumentParser(description="Startup benchmark of the IPPcode23 interpreter.")
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Runs of each measurement, the median is reported."
+    )
+    parser.add_argument(
+        "--interpreter",
+        default=os.path.join(PROJECT, "interpret.py"),
+        help="interpret.py to measure, the current revision by default.",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="interpret.py, its directory or a git revision to compare with.",
+    )
+    parser.add_argument(
+        "--args", default="", help="Extra arguments of interpret.py, for example --cache."
+    )
+    args = vars(parser.parse_args())
+
+    with tempfile.TemporaryDirectory() as directory:
+        startup = Startup(directory, args["repeat"], shlex.split(args["args"]))
+        current = startup.measure(args["interpreter"])
+        print_startup("current", current)
+        if args["baseline"] is not None:
+            baseline = startup.measure(resolve(args["baseline"], directory))
+            print_startup("baseline", baseline)
+            change = current["startup"] / baseline["startup"] - 1
+            print(f"change of the time to the first instruction {100 * change:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import hashlib
+import io
+import marshal
+import os
+import sys
+import time
+from status import *
+from loader import *
+from program import *
+
+"""
+Cache objects keep validated and linked programs on disk in .ippc files.
+A file is named by the hash of the source and of the interpreter version, so a program that
+is run again is read from one small file instead of parsing and validating its XML.
+"""
+
+
+class Cache:
+    VERSION = 2  # version of the program representation, bump it when it changes
+    MAGIC = b"IPPC"  # first bytes of every cache file
+    MAX_SIZE = 256 << 20  # maximum total size of the cache files in bytes
+    MAX_AGE = 30 * 24 * 60 * 60  # maximum time in seconds since the last use of a file
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.environ.get("IPP_CACHE_DIR")
+        if directory is None:
+            directory = os.path.join(os.path.expanduser("~"), ".cache", "ipp")
+        self.directory = directory  # directory with the cache files
+
+    # computes the key of the source from its content, its loader and the interpreter version
+    def _key(self, source, loader):
+        digest = hashlib.sha256()
+        digest.update(f"{self.VERSION} {sys.version_info[:2]} {loader.__name__}".encode())
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        else:
+            digest.update(source.getbuffer())
+        return digest.hexdigest()
+
+    # returns the path of the cache file for the key
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".ippc")
+
+    # reads the program from the cache file, returns None if it is missing or unusable
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if data[: len(self.MAGIC)] != self.MAGIC:
+            return None
+
+        try:
+            program = Program.restore(marshal.loads(data[len(self.MAGIC) :]))
+        except Exception:
+            return None
+
+        try:
+            # the time of the last use decides about the eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return program
+
+    # writes the program to the cache file, the cache is only an optimization, so errors are ignored
+    def _write(self, path, program):
+        temp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(self.MAGIC)
+                f.write(marshal.dumps(program.dump()))
+            os.replace(temp, path)
+        except (OSError, ValueError):
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+
+        self._evict()
+
+    # removes files unused for too long and then the least recently used ones over the size limit
+    def _evict(self):
+        files = []
+        now = time.time()
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".ippc"):
+                        continue
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+
+        files.sort()
+        total = sum(size for mtime, size, path in files)
+        for mtime, size, path in files:
+            if now - mtime <= self.MAX_AGE and total <= self.MAX_SIZE:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    # returns the program of the source, it is loaded by the loader only on a cache miss
+    def load(self, source, loader=Loader):
+        if source == sys.stdin:
+            # the standard input can be read only once
+            source = io.BytesIO(sys.stdin.buffer.read())
+
+        key = self._key(source, loader)
+        path = self._path(key)
+        program = self._read(path)
+        if program is None:
+            program = loader(source).load()
+            self._write(path, program)
+        return program
@@ -0,0 +1,418 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+from status import *
+from frame import *
+from instruction import *
+
+"""
+Compiler objects translate a loaded program into Python source, which is compiled and executed
+instead of the interpreter loop. Basic blocks are branches of a single loop selecting the block
+by the program counter, global variables are local variables of the generated function.
+Each instruction checks whether its operands are defined and have the right types and then runs
+its Python code, otherwise it calls the handler of the instruction, which reports the error.
+"""
+
+
+class Compiler:
+    ARITHMETIC = {"ADD": "+", "SUB": "-", "MUL": "*", "IDIV": "//"}  # int, int -> int
+    RELATIONS = {"LT": "<", "GT": ">", "EQ": "=="}  # same types -> bool
+    LOGICAL = {"AND": "and", "OR": "or"}  # bool, bool -> bool
+    ENDS = frozenset(
+        ("JUMP", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS", "CALL", "RETURN", "EXIT")
+    )  # end blocks
+    STACK_ARITHMETIC = {"ADDS": "+", "SUBS": "-", "MULS": "*", "IDIVS": "//"}  # int, int -> int
+    STACK_RELATIONS = {"LTS": "<", "GTS": ">", "EQS": "=="}  # same types -> bool
+    STACK_LOGICAL = {"ANDS": "and", "ORS": "or"}  # bool, bool -> bool
+    MAX_INSTRUCTIONS = 50000  # larger programs are interpreted, Python compiles them too slowly
+
+    def __init__(self, program):
+        self.program = program  # program being compiled
+        self.namespace = {}  # globals of the generated code
+        self.lines = []  # lines of the generated code
+        self.leaders = set()  # indices of the first instructions of the basic blocks
+        self.indent = 0  # current indentation level
+
+    # returns the generated function running the program or None if the program is too large,
+    # the source is written to the file if given, even for a program that is too large
+    def compile(self, file=None):
+        too_large = len(self.program.instructions) > self.MAX_INSTRUCTIONS
+        if too_large and file is None:
+            return None
+
+        source = self.generate()
+        if file is not None:
+            try:
+                with open(file, "w") as f:
+                    f.write(source)
+            except OSError:
+                exit_program(Status.OUTPUT_FILE_ERR, "Unable to write compiled program.")
+        if too_large:
+            return None
+
+        exec(compile(source, file or "<ippcode>", "exec"), self.namespace)
+        return self.namespace["run"]
+
+    # generates the Python source of the program
+    def generate(self):
+        instructions = self.program.instructions
+        self.namespace.update(
+            Var=Var,
+            TYPE_NAMES=TYPE_NAMES,
+            TYPE_TAGS=TYPE_TAGS,
+            append_text=append_text,
+            text_length=text_length,
+            char_at=char_at,
+            to_string=Instruction._to_string.__get__(Instruction.__new__(Instruction)),
+        )
+
+        self._emit("def run(vm):")
+        self.indent += 1
+        self._emit("frames = vm.frames")
+        self._emit("GF = frames[0]")
+        self._emit("stack = vm.stack")
+        self._emit("push = stack.append")
+        self._emit("pop = stack.pop")
+        self._emit("call_stack = vm.call_stack")
+        self._emit("write = vm.output.write")
+        for slot in range(len(self.program.global_slots)):
+            self._emit(f"g{slot} = None")
+        self._emit("pc = 0")
+        self._emit("while True:")
+        self.indent += 1
+        self.leaders = self._leaders()
+        self._blocks(sorted(self.leaders))
+
+        return "\n".join(self.lines) + "\n"
+
+    # appends a line of code at the current indentation
+    def _emit(self, line):
+        self.lines.append("    " * self.indent + line)
+
+    # returns the indices of the first instructions of the basic blocks
+    def _leaders(self):
+        instructions = self.program.instructions
+        leaders = {0, len(instructions)}
+        leaders.update(self.program.labels.values())
+        for instruction in instructions:
+            if instruction.opcode in self.ENDS:
+                # a call also returns to the next instruction
+                leaders.add(instruction.index + 1)
+        return {leader for leader in leaders if leader <= len(instructions)}
+
+    # generates a binary search of the block starting at the program counter
+    def _blocks(self, leaders):
+        if len(leaders) == 1:
+            self._block(leaders[0])
+            return
+
+        middle = len(leaders) // 2
+        self._emit(f"if pc < {leaders[middle]}:")
+        self.indent += 1
+        self._blocks(leaders[:middle])
+        self.indent -= 1
+        self._emit("else:")
+        self.indent += 1
+        self._blocks(leaders[middle:])
+        self.indent -= 1
+
+    # generates the basic block starting at the leader
+    def _block(self, leader):
+        instructions = self.program.instructions
+        if leader == len(instructions):
+            self._emit("return")
+            return
+
+        index = leader
+        while True:
+            instruction = instructions[index]
+            self._emit(f"# {index}: {instruction.order} {instruction.opcode}")
+            self._instruction(instruction)
+            index += 1
+            if index in self.leaders:
+                break
+
+        # the block falls through to the next one
+        self._emit(f"pc = {index}")
+        self._emit("continue")
+
+    # returns the name of the handler of the instruction, which is called when a check fails
+    def _handler(self, instruction):
+        name = f"x{instruction.index}"
+        handler = Instruction.HANDLERS[instruction.opcode]
+        self.namespace[name] = handler.__get__(instruction)
+        return f"{name}(vm)"
+
+    # returns the guards, the cell, the value and the type of a symbol, types are ints for literals
+    def _operand(self, op, op_type, position):
+        if op_type in LITERAL_TYPES:
+            return [], None, repr(op.value), op.type
+
+        kind, slot, name = op
+        if kind == GLOBAL:
+            cell = f"g{slot}"
+            guards = [f"{cell} is not None"]
+        else:
+            cell = f"c{position}"
+            guards = [
+                f"(f{position} := frames[{kind}]) is not None",
+                f"({cell} := f{position}[{slot}]) is not None",
+            ]
+        return guards, cell, f"{cell}.value", f"{cell}.type"
+
+    # adds the guard checking the type of the operand, returns False if a literal has another type
+    def _require(self, guards, operand_type, var_type):
+        if isinstance(operand_type, int):
+            return operand_type == var_type
+        guards.append(f"{operand_type} == {var_type}")
+        return True
+
+    # generates the guarded code of the instruction, the handler runs if the guard fails
+    def _guarded(self, instruction, guards, code):
+        if guards:
+            self._emit(f"if {' and '.join(dict.fromkeys(guards))}:")
+            self.indent += 1
+            for line in code:
+                self._emit(line)
+            self.indent -= 1
+            self._emit("else:")
+            self.indent += 1
+            self._emit(self._handler(instruction))
+            self.indent -= 1
+        else:
+            for line in code:
+                self._emit(line)
+
+    # generates the code of a jump to the index of the label
+    def _jump(self, target):
+        self._emit(f"pc = {target}")
+        self._emit("continue")
+
+    # generates the code of the instruction
+    def _instruction(self, instruction):
+        opcode = instruction.opcode
+        guards = []
+        code = None
+
+        if instruction.op1_type == "var" and opcode not in ("WRITE", "PUSHS", "EXIT", "DPRINT"):
+            dest_guards, dest, value, var_type = self._operand(
+                instruction.op1, instruction.op1_type, 0
+            )
+        if instruction.op2_type == "var" or instruction.op2_type in LITERAL_TYPES:
+            guards2, cell2, value2, type2 = self._operand(
+                instruction.op2, instruction.op2_type, 2
+            )
+        if instruction.op3_type == "var" or instruction.op3_type in LITERAL_TYPES:
+            guards3, cell3, value3, type3 = self._operand(
+                instruction.op3, instruction.op3_type, 3
+            )
+
+        if opcode == "LABEL" or opcode == "BREAK":
+            return
+        elif opcode == "DEFVAR" and instruction.op1[0] == GLOBAL:
+            slot = instruction.op1[1]
+            self._emit(f"if g{slot} is None:")
+            self.indent += 1
+            self._emit(f"g{slot} = GF[{slot}] = Var()")
+            self.indent -= 1
+            self._emit("else:")
+            self.indent += 1
+            self._emit(self._handler(instruction))
+            self.indent -= 1
+            return
+        elif opcode == "MOVE":
+            guards = dest_guards + guards2
+            if cell2 is None:
+                code = [f"{dest}.value = {value2}", f"{dest}.type = {type2}"]
+            else:
+                guards.append(f"{type2} != {UNSET}")
+                code = [f"{dest}.value = {value2}", f"{dest}.type = {type2}"]
+        elif opcode in self.ARITHMETIC:
+            guards = dest_guards + guards2 + guards3
+            if self._require(guards, type2, INT) and self._require(guards, type3, INT):
+                if opcode == "IDIV":
+                    guards.append(f"{value3} != 0")
+                result = f"{value2} {self.ARITHMETIC[opcode]} {value3}"
+                code = [f"{dest}.value = {result}", f"{dest}.type = {INT}"]
+        elif opcode in self.RELATIONS:
+            guards = dest_guards + guards2 + guards3
+            allowed = (INT, BOOL, STRING, NIL) if opcode == "EQ" else (INT, BOOL, STRING)
+            if isinstance(type2, int) or isinstance(type3, int):
+                # the literal decides the type of the other operand
+                literal_type = type2 if isinstance(type2, int) else type3
+                if (
+                    literal_type in allowed
+                    and self._require(guards, type2, literal_type)
+                    and self._require(guards, type3, literal_type)
+                ):
+                    code = []
+            else:
+                guards.append(f"{type2} == {type3}")
+                guards.append(f"{type2} in {allowed}")
+                code = []
+            if code is not None:
+                result = f"{value2} {self.RELATIONS[opcode]} {value3}"
+                code = [f"{dest}.value = {result}", f"{dest}.type = {BOOL}"]
+        elif opcode in self.LOGICAL:
+            guards = dest_guards + guards2 + guards3
+            if self._require(guards, type2, BOOL) and self._require(guards, type3, BOOL):
+                result = f"{value2} {self.LOGICAL[opcode]} {value3}"
+                code = [f"{dest}.value = {result}", f"{dest}.type = {BOOL}"]
+        elif opcode == "NOT":
+            guards = dest_guards + guards2
+            if self._require(guards, type2, BOOL):
+                code = [f"{dest}.value = not {value2}", f"{dest}.type = {BOOL}"]
+        elif opcode == "CONCAT":
+            guards = dest_guards + guards2 + guards3
+            if self._require(guards, type2, STRING) and self._require(guards, type3, STRING):
+                if instruction.op1 == instruction.op2:
+                    # appending to the variable itself edits its string in place
+                    code = [f"append_text({dest}, {value3})"]
+                else:
+                    code = [f"{dest}.value = {value2} + {value3}", f"{dest}.type = {STRING}"]
+        elif opcode == "STRLEN":
+            guards = dest_guards + guards2
+            if self._require(guards, type2, STRING):
+                length = f"len({value2})" if cell2 is None else f"text_length({cell2})"
+                code = [f"{dest}.value = {length}", f"{dest}.type = {INT}"]
+        elif opcode == "GETCHAR" or opcode == "STRI2INT":
+            guards = dest_guards + guards2 + guards3
+            if self._require(guards, type2, STRING) and self._require(guards, type3, INT):
+                # the variables are read without joining the buffers of their strings
+                if cell2 is None:
+                    length, char = f"len({value2})", f"{value2}[{value3}]"
+                else:
+                    length, char = f"text_length({cell2})", f"char_at({cell2}, {value3})"
+                guards.append(f"0 <= {value3} < {length}")
+                if opcode == "GETCHAR":
+                    code = [f"{dest}.value = {char}", f"{dest}.type = {STRING}"]
+                else:
+                    code = [f"{dest}.value = ord({char})", f"{dest}.type = {INT}"]
+        elif opcode == "INT2CHAR":
+            guards = dest_guards + guards2
+            if self._require(guards, type2, INT):
+                guards.append(f"0 <= {value2} <= 0x10FFFF")
+                code = [f"{dest}.value = chr({value2})", f"{dest}.type = {STRING}"]
+        elif opcode == "TYPE":
+            guards = dest_guards + guards2
+            if cell2 is None:
+                code = [f"{dest}.value = {TYPE_NAMES[type2]!r}", f"{dest}.type = {STRING}"]
+            else:
+                code = [f"{dest}.value = TYPE_NAMES[{type2}]", f"{dest}.type = {STRING}"]
+        elif opcode == "WRITE" or opcode == "PUSHS":
+            guards, cell, value, var_type = self._operand(
+                instruction.op1, instruction.op1_type, 1
+            )
+            if cell is None:
+                if opcode == "WRITE":
+                    text = Instruction._to_string(instruction, instruction.op1)
+                    code = [f"write({text!r})"]
+                else:
+                    code = [f"push({value})"]
+            else:
+                guards.append(f"{var_type} != {UNSET}")
+                if opcode == "WRITE":
+                    code = [
+                        f"write({value} if {var_type} == {STRING} else to_string({cell}))"
+                    ]
+                else:
+                    code = [f"push({value})"]
+        elif opcode == "POPS":
+            guards = ["stack"] + dest_guards
+            code = ["value = pop()", f"{dest}.value = value", f"{dest}.type = TYPE_TAGS[type(value)]"]
+        elif opcode == "CLEARS":
+            code = ["stack.clear()"]
+        elif opcode in self.STACK_ARITHMETIC:
+            guards = ["len(stack) > 1", "type(stack[-1]) is int", "type(stack[-2]) is int"]
+            if opcode == "IDIVS":
+                guards.append("stack[-1] != 0")
+            code = ["value = pop()", f"stack[-1] = stack[-1] {self.STACK_ARITHMETIC[opcode]} value"]
+        elif opcode in self.STACK_RELATIONS:
+            guards = ["len(stack) > 1", "type(stack[-1]) is type(stack[-2])"]
+            if opcode != "EQS":
+                guards.append("stack[-1] is not None")
+            code = ["value = pop()", f"stack[-1] = stack[-1] {self.STACK_RELATIONS[opcode]} value"]
+        elif opcode in self.STACK_LOGICAL:
+            guards = ["len(stack) > 1", "type(stack[-1]) is bool", "type(stack[-2]) is bool"]
+            code = ["value = pop()", f"stack[-1] = stack[-1] {self.STACK_LOGICAL[opcode]} value"]
+        elif opcode == "NOTS":
+            guards = ["stack", "type(stack[-1]) is bool"]
+            code = ["stack[-1] = not stack[-1]"]
+        elif opcode == "JUMP":
+            self._jump(instruction.target)
+            return
+        elif opcode == "JUMPIFEQ" or opcode == "JUMPIFNEQ":
+            self._conditional_jump(instruction, guards2, value2, type2, guards3, value3, type3)
+            return
+        elif opcode == "CALL":
+            if instruction.tail_call == "POPFRAME":
+                self._emit("if call_stack:")
+                self.indent += 1
+                self._emit(f"call_stack[-1] += {Instruction.PENDING_POPFRAME}")
+                self.indent -= 1
+                self._emit("else:")
+                self.indent += 1
+                self._emit(f"call_stack.append({instruction.index + 1})")
+                self.indent -= 1
+            elif instruction.tail_call != "RETURN":
+                self._emit(f"call_stack.append({instruction.index + 1})")
+            self._jump(instruction.target)
+            return
+        elif opcode == "RETURN":
+            # the handler does the pending POPFRAME instructions of tail calls
+            self._emit(f"if call_stack and call_stack[-1] < {Instruction.PENDING_POPFRAME}:")
+            self.indent += 1
+            self._emit("pc = call_stack.pop()")
+            self._emit("continue")
+            self.indent -= 1
+
+        if code is None:
+            # the handler interprets the instruction, jumps continue at the returned index
+            if opcode in self.ENDS:
+                self._emit(f"pc = {self._handler(instruction)}")
+                self._emit("continue")
+            else:
+                self._emit(self._handler(instruction))
+            return
+
+        self._guarded(instruction, guards, code)
+
+    # generates the code of JUMPIFEQ or JUMPIFNEQ to a defined label
+    def _conditional_jump(self, instruction, guards2, value2, type2, guards3, value3, type3):
+        guards = guards2 + guards3
+        checked = True
+        if isinstance(type2, int) and isinstance(type3, int):
+            checked = type2 == type3
+        elif isinstance(type2, int) or isinstance(type3, int):
+            literal_type = type2 if isinstance(type2, int) else type3
+            checked = self._require(guards, type2, literal_type) and self._require(
+                guards, type3, literal_type
+            )
+        else:
+            guards.append(f"{type2} == {type3}")
+            guards.append(f"{type2} != {UNSET}")
+
+        if not checked:
+            # the types differ, the handler decides about nil operands and errors
+            self._emit(f"pc = {self._handler(instruction)}")
+            self._emit("continue")
+            return
+
+        operator = "==" if instruction.opcode == "JUMPIFEQ" else "!="
+        if guards:
+            self._emit(f"if {' and '.join(dict.fromkeys(guards))}:")
+            self.indent += 1
+        self._emit(f"if {value2} {operator} {value3}:")
+        self.indent += 1
+        self._jump(instruction.target)
+        self.indent -= 1
+        if guards:
+            self.indent -= 1
+            self._emit("else:")
+            self.indent += 1
+            self._emit(f"pc = {self._handler(instruction)}")
+            self._emit("continue")
+            self.indent -= 1
@@ -1,52 +1,128 @@
-"""
-IPP - Project 2
-Author: Roman Janota
-Date: 16-04-2023
-"""
-
-from dataclasses import dataclass
-from status import *
-
-
-# a wrapper around variable value and type pair
-@dataclass
-class Var:
-    value: str = ""
-    var_type: str = ""
-
-
-class Frame:
-    def __init__(self):
-        self.vars = {}
-
-    # inserts the variable into the frames variable storage
-    def insert_var(self, name, value, var_type):
-        for key in self.vars.keys():
-            if key == name:
-                exit_program(Status.SEMTANTIC_ERR, "Variable already exists")
-        self.vars[name] = Var(value, var_type)
-
-    # sets the variable's new value and type
-    def set_value(self, dest, src, src_type):
-        if dest not in self.vars:
-            exit_program(Status.VAR_NOT_EXIST_ERR, f"Variable {dest} not defined.")
-
-        if src_type is None:
-            src_type = self.get_type(src)
-
-        if str(src).find("F@") != -1:
-            self.vars[dest] = Var(src[src.find("@") + 1 :], src_type)
-        else:
-            self.vars[dest] = Var(src, src_type)
-
-    # gets variable's value
-    def get_value(self, name):
-        if name not in self.vars:
-            exit_program(Status.VAR_NOT_EXIST_ERR, f"Variable {name} not defined.")
-        return self.vars[name].value
-
-    # gets variable's type
-    def get_type(self, name):
-        if name not in self.vars:
-            exit_program(Status.VAR_NOT_EXIST_ERR, f"Variable {name} not defined.")
-        return self.vars[name].var_type
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+from status import *
+
+# type tags of the values stored in variables
+UNSET = 0
+INT = 1
+BOOL = 2
+STRING = 3
+NIL = 4
+
+# XML types of the literal operands
+LITERAL_TYPES = frozenset(("int", "bool", "string", "nil"))
+
+# names of the types as returned by the TYPE instruction
+TYPE_NAMES = {UNSET: "", INT: "int", BOOL: "bool", STRING: "string", NIL: "nil"}
+
+# type tags of the native values, the values on the data stack are kept without cells
+TYPE_TAGS = {int: INT, bool: BOOL, str: STRING, type(None): NIL}
+
+
+# a variable cell holding a native value and its type tag, it is mutated in place
+class Var:
+    __slots__ = ("value", "type")
+
+    def __init__(self, value=None, var_type=UNSET):
+        self.value = value
+        self.type = var_type
+
+
+# strings shorter than this are copied by CONCAT and SETCHAR, longer ones are edited in a buffer
+BUFFER_LENGTH = 256
+
+# the slot of a cell, it reads and writes the value without the property of TextVar
+_value = Var.value
+
+
+# a string cell whose value slot holds a list of its characters, which is edited in place,
+# reading the value joins the characters once and turns the cell back into a plain Var,
+# so the rest of the interpreter sees a str and plain cells pay nothing for the buffers
+class TextVar(Var):
+    __slots__ = ()
+
+    def _get_value(self):
+        text = "".join(_value.__get__(self))
+        _value.__set__(self, text)
+        self.__class__ = Var
+        return text
+
+    def _set_value(self, value):
+        _value.__set__(self, value)
+        self.__class__ = Var
+
+    value = property(_get_value, _set_value)
+
+
+# turns the string cell into a TextVar holding the characters of the string
+def _buffer(cell):
+    chars = list(cell.value)
+    _value.__set__(cell, chars)
+    cell.__class__ = TextVar
+    return chars
+
+
+# appends the text to the string in the cell in amortized constant time
+def append_text(cell, text):
+    if cell.__class__ is TextVar:
+        _value.__get__(cell).extend(text)
+    elif len(cell.value) + len(text) < BUFFER_LENGTH:
+        cell.value += text
+    else:
+        _buffer(cell).extend(text)
+
+
+# replaces the character at a valid position of the string in the cell,
+# an empty text removes the character and a longer one is cut to its first character
+def set_char(cell, position, text):
+    if cell.__class__ is TextVar:
+        _value.__get__(cell)[position : position + 1] = text[:1]
+    elif len(cell.value) < BUFFER_LENGTH:
+        cell.value = cell.value[:position] + text[:1] + cell.value[position + 1 :]
+    else:
+        _buffer(cell)[position : position + 1] = text[:1]
+
+
+# returns the length of the string in the cell without joining its buffer
+def text_length(cell):
+    if cell.__class__ is TextVar:
+        return len(_value.__get__(cell))
+    return len(cell.value)
+
+
+# returns the character at a valid position of the string in the cell without joining its buffer
+def char_at(cell, position):
+    if cell.__class__ is TextVar:
+        return _value.__get__(cell)[position]
+    return cell.value[position]
+
+
+# kinds of frames, a resolved variable is a pair of the frame kind and a slot in that frame
+GLOBAL = 0
+LOCAL = 1
+TEMPORARY = 2
+
+# frame kinds by the prefix of the variable name
+FRAME_KINDS = {"GF": GLOBAL, "LF": LOCAL, "TF": TEMPORARY}
+
+
+# a frame is an array of variable cells indexed by slot, None marks an undefined variable
+class Frame(list):
+    __slots__ = ()
+
+    def __init__(self, size):
+        super().__init__([None] * size)
+
+    # inserts the variable into the frames variable storage
+    def insert_var(self, slot, name):
+        if self[slot] is not None:
+            exit_program(Status.SEMTANTIC_ERR, f"Variable {name} already exists")
+        self[slot] = Var()
+
+    # undefines all the variables, so the frame can be reused
+    def clear_vars(self):
+        self[:] = [None] * len(self)
@@ -1,1117 +1,1614 @@
-"""
-IPP - Project 2
-Author: Roman Janota
-Date: 16-04-2023
-"""
-
-from status import *
-from frame import *
-from collections import deque
-import re
-import ast
-
-"""
-Instruction objects represent XML instruction elements.
-They depend on sharing their static class variables with each other.
-The class contains various methods for validation and execution of the instructions.
-"""
-
-
-class Instruction:
-    GF = Frame()  # Global frame
-    TF = None  # Temporary frame
-    LF = deque()  # Local frame stack
-    stack = deque()  # IPPcode23 instruction's stack
-    inputs = deque()  # Inputs queue
-    labels = {}  # Labels dictionary
-    call_stack = deque()  # Function call stack
-
-    def __init__(self, tree, file):
-        self.order = int(tree.attrib["order"])  # instruction element's order
-        self.opcode = tree.attrib["opcode"].upper()  # instruction element's opcode
-        self.op1 = ""  # instruction element's arg1 value
-        self.op1_type = ""  # instruction element's arg1 type
-        self.op2 = ""  # instruction element's arg2 value
-        self.op2_type = ""  # instruction element's arg2 type
-        self.op3 = ""  # instruction element's arg3 value
-        self.op3_type = ""  # instruction element's arg3 type
-        self.in_file = file  # file with inputs for IPPcode23 instructions
-        self._fill_input(file)  # fill the inputs queue if possible
-
-    # fills the labels dictionary
-    def create_labels(self):
-        if self.opcode == "LABEL":
-            for label in self.labels.keys():
-                if self.op1 == label:
-                    exit_program(
-                        Status.SEMTANTIC_ERR,
-                        "Attempted to create two labels with same name.",
-                    )
-
-            self.labels[self.op1] = int(self.order) + 1
-
-    # fills the inputs queue if possible
-    def _fill_input(self, file):
-        if file != sys.stdin:
-            with open(file) as f:
-                lines = f.readlines()
-            for line in lines:
-                self.inputs.append(line.strip())
-            f.close()
-
-    # gets the frame of a variable
-    def _get_frame(self, var):
-        if var.find("GF@") != -1:
-            return self.GF
-        elif var.find("TF@") != -1:
-            if self.TF is None:
-                exit_program(
-                    Status.FRAME_NOT_EXIST_ERR,
-                    "Attempted to access a temporary frame without creating it first.",
-                )
-            return self.TF
-        elif var.find("LF@") != -1:
-            if len(self.LF) == 0:
-                exit_program(
-                    Status.FRAME_NOT_EXIST_ERR,
-                    "Attempted to access a local frame without creating it first.",
-                )
-            return self.LF[0]
-        else:
-            exit_program(
-                Status.INVALID_XML_ERR, "Expected frame name in variable name."
-            )
-
-    # checks if a symbol is a variable
-    def _is_var(self, name):
-        if name is None:
-            return False
-
-        name = str(name)
-        if name.find("F@") != -1:
-            return True
-        return False
-
-    # arithmetic instructions arguments checks
-    def _check_arithmetic_args(
-        self, arg1_type, arg1_val, arg2_type, arg2_val, instruction
-    ):
-        if (arg1_type is None and arg1_val is None) or (
-            arg2_type is None and arg2_val is None
-        ):
-            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
-
-        if arg1_type != "int" or arg2_type != "int":
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR,
-                f"Expected two integer operands in {instruction} instruction.",
-            )
-
-    # logical instructions arguments checks
-    def _check_logical_args(
-        self, arg1_type, arg1_val, arg2_type, arg2_val, instruction
-    ):
-        if (arg1_type is None and arg1_val is None) or (
-            instruction != "NOT" and arg2_type is None and arg2_val is None
-        ):
-            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
-
-        if arg1_type != "bool" or (
-            instruction != "NOT" and arg2_type is not None and arg2_type != "bool"
-        ):
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR,
-                f"Expected two boolean operands in {instruction} instruction.",
-            )
-
-    # relation instructions arguments checks
-    def _check_relation_args(
-        self, arg1_type, arg1_val, arg2_type, arg2_val, instruction
-    ):
-        if (arg1_type is None and arg1_val is None) or (
-            arg2_type is None and arg2_val is None
-        ):
-            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
-
-        if arg1_type != arg2_type:
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR,
-                f"Expected same types of operands in {instruction} instruction.",
-            )
-
-        if instruction != "EQ":
-            if arg1_type == "nil" or arg2_type == "nil":
-                exit_program(Status.MISMATCHED_TYPES_ERR, "Nil as operand in LT.")
-
-    # flow control instructions arguments checks
-    def _check_jump_args(self, arg1_type, arg1_val, arg2_type, arg2_val, instruction):
-        if (arg1_type is None and arg1_val is None) or (
-            arg2_type is None and arg2_val is None
-        ):
-            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
-
-        if arg1_type != arg2_type and arg1_type != "nil" and arg2_type != "nil":
-            exit_program(Status.MISMATCHED_TYPES_ERR, f"Wrong types in {instruction}")
-
-        if self.op1 not in self.labels:
-            exit_program(Status.SEMTANTIC_ERR, f"Label {self.op1} not defined.")
-
-    # gets symbols types and values
-    def _get_frame_value_types(self, sym1, sym1_type, sym2, sym2_type):
-        if self._is_var(sym1):
-            frame1 = self._get_frame(sym1)
-            value1 = frame1.get_value(sym1)
-            type1 = frame1.get_type(sym1)
-        else:
-            value1 = sym1
-            type1 = sym1_type
-
-        if self._is_var(sym2):
-            frame2 = self._get_frame(sym2)
-            value2 = frame2.get_value(sym2)
-            type2 = frame2.get_type(sym2)
-        else:
-            value2 = sym2
-            type2 = sym2_type
-
-        return value1, type1, value2, type2
-
-    # The actual interpretation of IPPcode23 instruction set follows
-    def _do_move(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        if value1 is None or type1 is None:
-            exit_program(
-                Status.MISSING_VALUE_ERR,
-                f"Var {self.op2} has to be set before assingning.",
-            )
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, value1, type1)
-
-    def _do_createframe(self):
-        self.TF = Frame()
-
-    def _do_pushframe(self):
-        if self.TF is None:
-            exit_program(
-                Status.FRAME_NOT_EXIST_ERR, "Attempted to push an undefined frame."
-            )
-
-        frame = Frame()
-        for var in self.TF.vars:
-            # change TF variable names to LF
-            old_name = var.find("@")
-            new_name = "LF" + var[old_name:]
-            frame.vars[new_name] = self.TF.vars[var]
-
-        self.LF.appendleft(frame)
-        self.TF = None
-
-    def _do_popframe(self):
-        if len(self.LF) == 0:
-            exit_program(
-                Status.FRAME_NOT_EXIST_ERR, "Unable to pop from empty LF stack."
-            )
-
-        new_frame = Frame()
-        old_frame = self.LF.popleft()
-        for var in old_frame.vars:
-            # change LF variable names to TF
-            old_name = var.find("@")
-            new_name = "TF" + var[old_name:]
-            new_frame.vars[new_name] = old_frame.vars[var]
-
-        self.TF = new_frame
-
-    def _do_defvar(self):
-        frame = self._get_frame(self.op1)
-
-        frame.insert_var(self.op1, None, None)
-
-    def _do_call(self):
-        self.call_stack.appendleft(int(self.order) + 1)
-
-        return self._do_jump()
-
-    def _do_return(self):
-        if len(self.call_stack) == 0:
-            exit_program(
-                Status.MISSING_VALUE_ERR, "Tried to use RETURN without calling."
-            )
-
-        return int(self.call_stack.popleft())
-
-    def _do_pushs(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op1, self.op1_type, None, None
-        )
-
-        if value1 is None or type1 is None:
-            exit_program(
-                Status.MISSING_VALUE_ERR, f"Variable {self.op1} not set in PUSHS."
-            )
-
-        self.stack.appendleft(Var(value1, type1))
-
-    def _do_pops(self):
-        if len(self.stack) == 0:
-            exit_program(Status.MISSING_VALUE_ERR, "Unable to pop from empty stack.")
-
-        symbol = self.stack.popleft()
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, symbol.value, symbol.var_type)
-
-    def _do_add(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_arithmetic_args(type1, value1, type2, value2, "ADD")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, int(value1) + int(value2), "int")
-
-    def _do_mul(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_arithmetic_args(type1, value1, type2, value2, "MUL")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, int(value1) * int(value2), "int")
-
-    def _do_sub(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_arithmetic_args(type1, value1, type2, value2, "SUB")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, int(value1) - int(value2), "int")
-
-    def _do_idiv(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_arithmetic_args(type1, value1, type2, value2, "IDIV")
-
-        if int(value2) == 0:
-            exit_program(Status.VALUE_ERR, "Division by 0 attempted.")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, int(value1) // int(value2), "int")
-
-    def _do_lt(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_relation_args(type1, value1, type2, value2, "LT")
-
-        if type1 == "int":
-            if int(value1) < int(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "string":
-            if str(value1) < str(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "bool":
-            if value1 == "false" and value1 != value2:
-                ret = "true"
-            else:
-                ret = "false"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_gt(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_relation_args(type1, value1, type2, value2, "GT")
-
-        if type1 == "int":
-            if int(value1) > int(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "string":
-            if str(value1) > str(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "bool":
-            if value1 == "true" and value1 != value2:
-                ret = "true"
-            else:
-                ret = "false"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_eq(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_relation_args(type1, value1, type2, value2, "EQ")
-
-        if type1 == "int":
-            if int(value1) == int(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "string":
-            if str(value1) == str(value2):
-                ret = "true"
-            else:
-                ret = "false"
-        elif type1 == "bool":
-            if value1 == value2:
-                ret = "true"
-            else:
-                ret = "false"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_and(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_logical_args(type1, value1, type2, value2, "AND")
-
-        if value1 == "true" and value2 == "true":
-            ret = "true"
-        else:
-            ret = "false"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_or(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_logical_args(type1, value1, type2, value2, "OR")
-
-        if value1 == "true" or value2 == "true":
-            ret = "true"
-        else:
-            ret = "false"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_not(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        self._check_logical_args(type1, value1, None, None, "NOT")
-
-        if value1 == "true":
-            ret = "false"
-        else:
-            ret = "true"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "bool")
-
-    def _do_int2char(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        if value1 is None and type1 is None:
-            exit_program(
-                Status.MISSING_VALUE_ERR, f"Variable {self.op2} not set in INT2CHAR."
-            )
-
-        if type1 != "int":
-            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in INT2CHAR")
-
-        try:
-            ret = chr(int(value1))
-        except:
-            exit_program(Status.STRING_ERR, "Expected valid value in INT2CHAR")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "string")
-
-    def _do_stri2int(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        if (value1 is None and type1 is None) or (value2 is None and type2 is None):
-            exit_program(
-                Status.MISSING_VALUE_ERR, f"Variable {self.op2} not set in STRI2INT."
-            )
-
-        if type1 != "string" or type2 != "int":
-            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in STRI2INT")
-
-        if int(value2) < 0 or int(value2) > len(value1):
-            exit_program(Status.STRING_ERR, "Invalid length in STRI2INT")
-
-        try:
-            ret = ord(str(value1[int(value2)]))
-        except:
-            exit_program(Status.STRING_ERR, "Expected valid value in STRI2INT")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "int")
-
-    def _do_read(self):
-        if self.in_file != sys.stdin:
-            # read from queue if command line arg was specified
-            if len(self.inputs) == 0:
-                read = "nil"
-            else:
-                read = self.inputs.popleft()
-        else:
-            read = input()
-
-        if self.op2 == "int":
-            try:
-                value = int(read)
-            except:
-                read = "nil"
-            type1 = "int"
-        elif self.op2 == "bool":
-            if read.lower() == "true":
-                value = "true"
-            else:
-                value = "false"
-            type1 = "bool"
-        else:
-            value = str(read)
-            type1 = "string"
-
-        if read == "nil":
-            value = "nil"
-            type1 = "nil"
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, value, type1)
-
-    def _do_write(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op1, self.op1_type, None, None
-        )
-
-        if value1 is None:
-            exit_program(
-                Status.MISSING_VALUE_ERR,
-                f"Can not write an uninitialized symbol {self.op1}",
-            )
-
-        if str(type1).find("nil") != -1:
-            value1 = ""
-
-        print(value1, end="")
-
-    def _do_concat(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        if (type1 is None and value1 is None) or (type2 is None and value2 is None):
-            exit_program(Status.MISSING_VALUE_ERR, "Var not set in CONCAT.")
-
-        if type1 != "string" or type2 != "string":
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in CONCAT."
-            )
-
-        if value1 is None and value2 is None:
-            ret = ""
-        elif value2 is None:
-            ret = value1
-        elif value1 is None:
-            ret = value2
-        else:
-            ret = value1 + value2
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, ret, "string")
-
-    def _do_strlen(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        if value1 is None and type1 is None:
-            exit_program(Status.MISSING_VALUE_ERR, "Missing value in STRLEN.")
-
-        if type1 != "string":
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in STRLEN."
-            )
-
-        if value1 is None:
-            length = 0
-        else:
-            length = len(value1)
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, length, "int")
-
-    def _do_getchar(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        if (type1 is None and value1 is None) or (type2 is None and value2 is None):
-            exit_program(Status.MISSING_VALUE_ERR, "Var not set in GETCHAR.")
-
-        if type1 != "string" or type2 != "int":
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in GETCHAR."
-            )
-
-        if int(value2) >= len(value1) or int(value2) < 0:
-            exit_program(Status.STRING_ERR, "Bad value in GETCHAR.")
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, value1[int(value2)], "string")
-
-    def _do_setchar(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        if (type1 is None and value1 is None) or (type2 is None and value2 is None):
-            exit_program(Status.MISSING_VALUE_ERR, "Var not set in GETCHAR.")
-
-        frame = self._get_frame(self.op1)
-        value = frame.get_value(self.op1)
-        Type = frame.get_type(self.op1)
-
-        if type1 != "int" or type2 != "string" or Type != "string":
-            exit_program(
-                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in SETCHAR."
-            )
-
-        if int(value1) < 0 or int(value1) >= len(value):
-            exit_program(Status.STRING_ERR, "Bad value in SETCHAR.")
-
-        if len(value2) > 1:
-            new_value = value[: int(value1)] + value2[0] + value[int(value1) + 1 :]
-        else:
-            new_value = value[: int(value1)] + value2 + value[int(value1) + 1 :]
-
-        frame.set_value(self.op1, new_value, "string")
-
-    def _do_type(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        if type1 is None:
-            type1 = ""
-
-        frame = self._get_frame(self.op1)
-        frame.set_value(self.op1, type1, "string")
-
-    def _do_jump(self):
-        for label in self.labels:
-            if label == self.op1:
-                return self.labels[label]
-
-        exit_program(Status.SEMTANTIC_ERR, "Attempted to jump to a non existant label.")
-
-    def _do_jumpifeq(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_jump_args(type1, value1, type2, value2, "JUMPIFEQ")
-
-        ret = False
-        if type1 == "int" and type2 == "int":
-            if int(value1) == int(value2):
-                ret = True
-        elif type1 == "string" or type1 == "bool" or value1 == "nil":
-            if value1 == value2:
-                ret = True
-
-        if ret is True:
-            return self._do_jump()
-        else:
-            return self.order + 1
-
-    def _do_jumpifneq(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, self.op3, self.op3_type
-        )
-
-        self._check_jump_args(type1, value1, type2, value2, "JUMPIFNEQ")
-
-        ret = False
-        if type1 == "int" and type2 == "int":
-            if int(value1) == int(value2):
-                ret = True
-        elif type1 == "string" or type1 == "bool" or value1 == "nil":
-            if value1 == value2:
-                ret = True
-
-        if ret is False:
-            return self._do_jump()
-        else:
-            return self.order + 1
-
-    def _do_exit(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op1, self.op1_type, None, None
-        )
-
-        if type1 is None and value1 is None:
-            exit_program(Status.MISSING_VALUE_ERR, "Variable not set in EXIT.")
-
-        if type1 != "int":
-            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected integer value in EXIT.")
-
-        if int(value1) < 0 or int(value1) > 49:
-            exit_program(Status.VALUE_ERR, "Invalid EXIT value.")
-
-        sys.exit(int(value1))
-
-    def _do_dprint(self):
-        value1, type1, value2, type2 = self._get_frame_value_types(
-            self.op2, self.op2_type, None, None
-        )
-
-        print(value1, file=sys.stderr)
-
-    # calls the corresponding function based on the opcode and returns the next order
-    def execute(self):
-        order = 0
-
-        if self.opcode == "MOVE":
-            self._do_move()
-        elif self.opcode == "CREATEFRAME":
-            self._do_createframe()
-        elif self.opcode == "PUSHFRAME":
-            self._do_pushframe()
-        elif self.opcode == "POPFRAME":
-            self._do_popframe()
-        elif self.opcode == "DEFVAR":
-            self._do_defvar()
-        elif self.opcode == "CALL":
-            order = self._do_call()
-        elif self.opcode == "RETURN":
-            order = self._do_return()
-        elif self.opcode == "PUSHS":
-            self._do_pushs()
-        elif self.opcode == "POPS":
-            self._do_pops()
-        elif self.opcode == "ADD":
-            self._do_add()
-        elif self.opcode == "MUL":
-            self._do_mul()
-        elif self.opcode == "SUB":
-            self._do_sub()
-        elif self.opcode == "IDIV":
-            self._do_idiv()
-        elif self.opcode == "LT":
-            self._do_lt()
-        elif self.opcode == "GT":
-            self._do_gt()
-        elif self.opcode == "EQ":
-            self._do_eq()
-        elif self.opcode == "AND":
-            self._do_and()
-        elif self.opcode == "OR":
-            self._do_or()
-        elif self.opcode == "NOT":
-            self._do_not()
-        elif self.opcode == "INT2CHAR":
-            self._do_int2char()
-        elif self.opcode == "STRI2INT":
-            self._do_stri2int()
-        elif self.opcode == "READ":
-            self._do_read()
-        elif self.opcode == "WRITE":
-            self._do_write()
-        elif self.opcode == "CONCAT":
-            self._do_concat()
-        elif self.opcode == "STRLEN":
-            self._do_strlen()
-        elif self.opcode == "GETCHAR":
-            self._do_getchar()
-        elif self.opcode == "SETCHAR":
-            self._do_setchar()
-        elif self.opcode == "TYPE":
-            self._do_type()
-        elif self.opcode == "LABEL":
-            pass
-        elif self.opcode == "JUMP":
-            order = self._do_jump()
-        elif self.opcode == "JUMPIFEQ":
-            order = self._do_jumpifeq()
-        elif self.opcode == "JUMPIFNEQ":
-            order = self._do_jumpifneq()
-        elif self.opcode == "EXIT":
-            self._do_exit()
-        elif self.opcode == "DPRINT":
-            self._do_dprint()
-
-        if order == 0:
-            return self.order + 1
-        else:
-            return order
-
-    # validates the instruction, it's argument count and types if possible
-    def validate(self, tree):
-        if self.opcode == "MOVE":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "CREATEFRAME":
-            pass
-        elif self.opcode == "PUSHFRAME":
-            pass
-        elif self.opcode == "POPFRAME":
-            pass
-        elif self.opcode == "DEFVAR":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "CALL":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "RETURN":
-            pass
-        elif self.opcode == "PUSHS":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] != "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "POPS":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "ADD":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "SUB":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "MUL":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "IDIV":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "LT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "GT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "EQ":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "AND":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "OR":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "NOT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "INT2CHAR":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "STRI2INT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "READ":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] == "type":
-                    if (
-                        element.text != "int"
-                        and element.text != "string"
-                        and element.text != "bool"
-                    ):
-                        exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "WRITE":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] != "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "CONCAT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "STRLEN":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "GETCHAR":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "SETCHAR":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "TYPE":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "var":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "LABEL":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "JUMP":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "JUMPIFEQ":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "JUMPIFNEQ":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] == "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                elif element.tag == "arg2" and element.attrib["type"] != "label":
-                    self.op2 = element.text
-                    self.op2_type = element.attrib["type"]
-                elif element.tag == "arg3" and element.attrib["type"] != "label":
-                    self.op3 = element.text
-                    self.op3_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "EXIT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] != "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "DPRINT":
-            for element in tree:
-                if element.tag == "arg1" and element.attrib["type"] != "label":
-                    self.op1 = element.text
-                    self.op1_type = element.attrib["type"]
-                else:
-                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
-        elif self.opcode == "BREAK":
-            pass
-        else:
-            exit_program(Status.INVALID_XML_ERR, "Unexpected opcode.")
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+from status import *
+from frame import *
+import operator
+
+"""
+Instruction objects represent XML instruction elements.
+They keep no state of a run, their handlers get the VM of the run as their argument.
+The class contains various methods for validation and execution of the instructions.
+"""
+
+
+class Instruction:
+    def __init__(self, tree):
+        self.order = int(tree.attrib["order"])  # instruction element's order
+        self.index = 0  # index of the instruction in the program's array
+        self.opcode = tree.attrib["opcode"].upper()  # instruction element's opcode
+        self.op1 = ""  # instruction element's arg1 value
+        self.op1_type = ""  # instruction element's arg1 type
+        self.op2 = ""  # instruction element's arg2 value
+        self.op2_type = ""  # instruction element's arg2 type
+        self.op3 = ""  # instruction element's arg3 value
+        self.op3_type = ""  # instruction element's arg3 type
+        self.target = None  # index following the label of a jump or call, set by linking
+        self.tail_call = ""  # RETURN or POPFRAME if a CALL is followed by it, set by linking
+        self._bind_handler()
+
+    # creates an instruction from the (type, text) pairs of its operands, which the text loader
+    # has already checked against OPERANDS, so only the literals are left to decode
+    @classmethod
+    def from_operands(cls, order, opcode, operands):
+        instruction = cls.__new__(cls)
+        instruction.order = order
+        instruction.index = 0
+        instruction.opcode = opcode
+        operands = operands + [("", "")] * (3 - len(operands))
+        (
+            (instruction.op1_type, op1),
+            (instruction.op2_type, op2),
+            (instruction.op3_type, op3),
+        ) = operands
+        instruction.op1 = instruction._decode_literal(op1, instruction.op1_type)
+        instruction.op2 = instruction._decode_literal(op2, instruction.op2_type)
+        instruction.op3 = instruction._decode_literal(op3, instruction.op3_type)
+        instruction.target = None
+        instruction.tail_call = ""
+        instruction._bind_handler()
+        return instruction
+
+    # binds the method interpreting the instruction, it returns the index of the next instruction
+    def _bind_handler(self):
+        handler = self.HANDLERS.get(self.opcode)
+        if handler is not None:
+            self.execute = handler.__get__(self)
+
+    # changes the instruction to another one keeping its first operand
+    def rewrite(self, opcode, op2="", op2_type="", op3="", op3_type=""):
+        self.opcode = opcode
+        self.op2 = op2
+        self.op2_type = op2_type
+        self.op3 = op3
+        self.op3_type = op3_type
+        self._bind_handler()
+
+    # selects a handler without the checks the type analysis proved unnecessary
+    def specialize(self, handler):
+        self.execute = handler.__get__(self)
+
+    # gets the cells of the operands when the specialized handler runs for the first time in a run,
+    # the VM keeps them, since the cell of a global variable does not change after its DEFVAR
+    def _bind_cells(self, vm):
+        cells = vm.cells[self.index] = (
+            self._cell(vm, self.op1, self.op1_type),
+            self._cell(vm, self.op2, self.op2_type),
+            self._cell(vm, self.op3, self.op3_type),
+        )
+        return cells
+
+    # gets the cell of a global variable or a literal, other operands have no cell
+    def _cell(self, vm, op, op_type):
+        if op_type == "var":
+            return vm.frames[GLOBAL][op[1]]
+        if op_type in LITERAL_TYPES:
+            return op
+        return None
+
+    # fuses the instruction with the instructions following it into a superinstruction,
+    # branch_on is the result of a relation that makes the fused jump taken
+    def fuse(self, handler, following, branch_on=None):
+        # the following instructions stay in the array, so they can still be executed on their own
+        self.sequence = [self] + following
+        self.branch_on = branch_on
+        self.next_index = self.index + len(self.sequence)
+        self.execute = handler.__get__(self)
+
+        # the profiler sees the tail call ending the sequence
+        self.tail_call = following[-1].tail_call
+
+    # returns the validated and resolved instruction as a tuple of plain values,
+    # the literals are stored as the indices of their cells in the constant pool of the program
+    def dump(self, program):
+        # interned strings are stored only once by marshal
+        return (
+            self.order,
+            sys.intern(self.opcode),
+            self._dump_operand(self.op1, program),
+            sys.intern(self.op1_type),
+            self._dump_operand(self.op2, program),
+            sys.intern(self.op2_type),
+            self._dump_operand(self.op3, program),
+            sys.intern(self.op3_type),
+        )
+
+    # converts the constant cell of a literal to its index in the constant pool
+    def _dump_operand(self, op, program):
+        if isinstance(op, Var):
+            return program.constant_index(op)
+        return op
+
+    # creates an instruction from the tuple returned by dump and the restored constant pool
+    @classmethod
+    def restore(cls, record, constants):
+        instruction = cls.__new__(cls)
+        instruction.index = 0
+        (
+            instruction.order,
+            instruction.opcode,
+            op1,
+            op1_type,
+            op2,
+            op2_type,
+            op3,
+            op3_type,
+        ) = record
+
+        # literals are converted back to the cells of the constant pool
+        instruction.op1 = constants[op1] if op1_type in LITERAL_TYPES else op1
+        instruction.op1_type = op1_type
+        instruction.op2 = constants[op2] if op2_type in LITERAL_TYPES else op2
+        instruction.op2_type = op2_type
+        instruction.op3 = constants[op3] if op3_type in LITERAL_TYPES else op3
+        instruction.op3_type = op3_type
+        instruction.target = None
+        instruction.tail_call = ""
+        instruction._bind_handler()
+        return instruction
+
+    # fills the labels dictionary
+    def create_labels(self, labels):
+        if self.opcode == "LABEL":
+            if self.op1 in labels:
+                exit_program(
+                    Status.SEMTANTIC_ERR,
+                    "Attempted to create two labels with same name.",
+                )
+
+            labels[self.op1] = self.index + 1
+
+    # stores the index a jump or call continues at, so it never looks up its label
+    def resolve_target(self, labels):
+        if self.opcode in self.JUMP_OPCODES:
+            target = labels.get(self.op1)
+            if target is None:
+                exit_program(Status.SEMTANTIC_ERR, f"Label {self.op1} not defined.")
+            self.target = target
+
+    # makes CALL followed by RETURN, or by POPFRAME and RETURN, a tail call,
+    # which returns right to the caller of the current function and does not grow the call stack
+    def bind_tail_call(self, following):
+        if following[:1] == ["RETURN"]:
+            self.tail_call = "RETURN"
+            self.execute = self._do_tail_call
+        elif following == ["POPFRAME", "RETURN"]:
+            self.tail_call = "POPFRAME"
+            self.execute = self._do_tail_call_popframe
+        else:
+            self.tail_call = ""
+            self._bind_handler()
+
+    # resolves the variable operands to pairs of the frame kind and the slot
+    def resolve_vars(self, program):
+        if self.op1_type == "var":
+            self.op1 = program.resolve_var(self.op1)
+        if self.op2_type == "var":
+            self.op2 = program.resolve_var(self.op2)
+        if self.op3_type == "var":
+            self.op3 = program.resolve_var(self.op3)
+
+    # replaces the literal cells by the shared cells of the constant pool of the program
+    def resolve_constants(self, program):
+        if self.op1_type in LITERAL_TYPES:
+            self.op1 = program.resolve_constant(self.op1)
+        if self.op2_type in LITERAL_TYPES:
+            self.op2 = program.resolve_constant(self.op2)
+        if self.op3_type in LITERAL_TYPES:
+            self.op3 = program.resolve_constant(self.op3)
+
+    # decodes a literal operand into a constant cell holding its native value
+    def _decode_literal(self, text, op_type):
+        if op_type == "int":
+            try:
+                return Var(int(text), INT)
+            except (TypeError, ValueError):
+                pass
+            try:
+                # hexadecimal and octal literals
+                return Var(int(text, 0), INT)
+            except (TypeError, ValueError):
+                exit_program(Status.INVALID_XML_ERR, f"Invalid integer literal {text}.")
+        elif op_type == "bool":
+            if text == "true":
+                return Var(True, BOOL)
+            if text == "false":
+                return Var(False, BOOL)
+            exit_program(Status.INVALID_XML_ERR, f"Invalid boolean literal {text}.")
+        elif op_type == "nil":
+            if text != "nil":
+                exit_program(Status.INVALID_XML_ERR, f"Invalid nil literal {text}.")
+            return Var(None, NIL)
+        elif op_type == "string":
+            if text is None:
+                text = ""
+            if "\\" in text:
+                text = self._decode_escapes(text)
+            return Var(text, STRING)
+
+        # variables, labels and types are kept as text
+        return text
+
+    # replaces the escape sequences of a string literal, a backslash and three decimal digits,
+    # by the characters with these codes
+    def _decode_escapes(self, text):
+        parts = text.split("\\")
+        chars = [parts[0]]
+        for part in parts[1:]:
+            code = part[:3]
+            if len(code) != 3 or not code.isascii() or not code.isdigit():
+                exit_program(Status.INVALID_XML_ERR, f"Invalid escape sequence in string {text}.")
+            chars.append(chr(int(code)))
+            chars.append(part[3:])
+        return "".join(chars)
+
+    # converts a value to its textual form for WRITE and DPRINT
+    def _to_string(self, symbol):
+        if symbol.type == BOOL:
+            return "true" if symbol.value else "false"
+        if symbol.type == NIL:
+            return ""
+        return str(symbol.value)
+
+    # arithmetic instructions arguments checks
+    def _check_arithmetic_args(self, sym1, sym2, instruction):
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
+
+        if sym1.type != INT or sym2.type != INT:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR,
+                f"Expected two integer operands in {instruction} instruction.",
+            )
+
+    # logical instructions arguments checks
+    def _check_logical_args(self, sym1, sym2, instruction):
+        if sym1.type == UNSET or (sym2 is not None and sym2.type == UNSET):
+            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
+
+        if sym1.type != BOOL or (sym2 is not None and sym2.type != BOOL):
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR,
+                f"Expected two boolean operands in {instruction} instruction.",
+            )
+
+    # relation instructions arguments checks
+    def _check_relation_args(self, sym1, sym2, instruction):
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
+
+        if sym1.type != sym2.type:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR,
+                f"Expected same types of operands in {instruction} instruction.",
+            )
+
+        if instruction != "EQ":
+            if sym1.type == NIL:
+                exit_program(Status.MISMATCHED_TYPES_ERR, "Nil as operand in LT.")
+
+    # flow control instructions arguments checks
+    def _check_jump_args(self, sym1, sym2, instruction):
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, f"Var not set in {instruction}.")
+
+        if sym1.type != sym2.type and sym1.type != NIL and sym2.type != NIL:
+            exit_program(Status.MISMATCHED_TYPES_ERR, f"Wrong types in {instruction}")
+
+    # The actual interpretation of IPPcode23 instruction set follows
+    def _do_move(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR,
+                f"Var {self.op2[2]} has to be set before assingning.",
+            )
+        vm.set_var(self.op1, sym1.value, sym1.type)
+
+        return self.index + 1
+
+    def _do_createframe(self, vm):
+        vm.release_frame(vm.frames[TEMPORARY])
+        vm.frames[TEMPORARY] = vm.new_frame()
+        return self.index + 1
+
+    def _do_pushframe(self, vm):
+        frame = vm.frames[TEMPORARY]
+        if frame is None:
+            exit_program(
+                Status.FRAME_NOT_EXIST_ERR, "Attempted to push an undefined frame."
+            )
+
+        # TF and LF variables share the slots, so the frame is moved as it is
+        vm.LF.append(frame)
+        vm.frames[LOCAL] = frame
+        vm.frames[TEMPORARY] = None
+
+        return self.index + 1
+
+    def _do_popframe(self, vm):
+        if len(vm.LF) == 0:
+            exit_program(
+                Status.FRAME_NOT_EXIST_ERR, "Unable to pop from empty LF stack."
+            )
+
+        vm.release_frame(vm.frames[TEMPORARY])
+        vm.frames[TEMPORARY] = vm.LF.pop()
+        vm.frames[LOCAL] = vm.LF[-1] if vm.LF else None
+
+        return self.index + 1
+
+    def _do_defvar(self, vm):
+        frame = vm.frames[self.op1[0]]
+        if frame is None:
+            vm.missing_frame(self.op1[0])
+
+        frame.insert_var(self.op1[1], self.op1[2])
+
+        return self.index + 1
+
+    def _do_call(self, vm):
+        vm.call_stack.append(self.index + 1)
+
+        return self.target
+
+    # the RETURN following the call would only return to the index on top of the call stack
+    def _do_tail_call(self, vm):
+        return self.target
+
+    # the POPFRAME and RETURN following the call are done when the called function returns,
+    # the return index on top of the call stack counts the POPFRAME instructions pending for it
+    def _do_tail_call_popframe(self, vm):
+        if len(vm.call_stack) == 0:
+            # the RETURN would fail after the POPFRAME, so it is a usual call
+            return self._do_call(vm)
+
+        vm.call_stack[-1] += self.PENDING_POPFRAME
+
+        return self.target
+
+    def _do_return(self, vm):
+        if len(vm.call_stack) == 0:
+            exit_program(
+                Status.MISSING_VALUE_ERR, "Tried to use RETURN without calling."
+            )
+
+        index = vm.call_stack.pop()
+        if index >= self.PENDING_POPFRAME:
+            # the tail calls returning here left their POPFRAME instructions to be done now
+            for _ in range(index // self.PENDING_POPFRAME):
+                self._do_popframe(vm)
+            index %= self.PENDING_POPFRAME
+
+        return index
+
+    def _do_pushs(self, vm):
+        sym1 = vm.symbol(self.op1, self.op1_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR, f"Variable {self.op1[2]} not set in PUSHS."
+            )
+
+        vm.stack.append(sym1.value)
+
+        return self.index + 1
+
+    def _do_pops(self, vm):
+        if len(vm.stack) == 0:
+            exit_program(Status.MISSING_VALUE_ERR, "Unable to pop from empty stack.")
+
+        value = vm.stack.pop()
+        vm.set_var(self.op1, value, TYPE_TAGS[type(value)])
+
+        return self.index + 1
+
+    def _do_add(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_arithmetic_args(sym1, sym2, "ADD")
+
+        vm.set_var(self.op1, sym1.value + sym2.value, INT)
+
+        return self.index + 1
+
+    def _do_mul(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_arithmetic_args(sym1, sym2, "MUL")
+
+        vm.set_var(self.op1, sym1.value * sym2.value, INT)
+
+        return self.index + 1
+
+    def _do_sub(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_arithmetic_args(sym1, sym2, "SUB")
+
+        vm.set_var(self.op1, sym1.value - sym2.value, INT)
+
+        return self.index + 1
+
+    def _do_idiv(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_arithmetic_args(sym1, sym2, "IDIV")
+
+        if sym2.value == 0:
+            exit_program(Status.VALUE_ERR, "Division by 0 attempted.")
+
+        vm.set_var(self.op1, sym1.value // sym2.value, INT)
+
+        return self.index + 1
+
+    def _do_lt(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_relation_args(sym1, sym2, "LT")
+
+        vm.set_var(self.op1, sym1.value < sym2.value, BOOL)
+
+        return self.index + 1
+
+    def _do_gt(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_relation_args(sym1, sym2, "GT")
+
+        vm.set_var(self.op1, sym1.value > sym2.value, BOOL)
+
+        return self.index + 1
+
+    def _do_eq(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_relation_args(sym1, sym2, "EQ")
+
+        vm.set_var(self.op1, sym1.value == sym2.value, BOOL)
+
+        return self.index + 1
+
+    def _do_and(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_logical_args(sym1, sym2, "AND")
+
+        vm.set_var(self.op1, sym1.value and sym2.value, BOOL)
+
+        return self.index + 1
+
+    def _do_or(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_logical_args(sym1, sym2, "OR")
+
+        vm.set_var(self.op1, sym1.value or sym2.value, BOOL)
+
+        return self.index + 1
+
+    def _do_not(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+
+        self._check_logical_args(sym1, None, "NOT")
+
+        vm.set_var(self.op1, not sym1.value, BOOL)
+
+        return self.index + 1
+
+    def _do_int2char(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR, f"Variable {self.op2[2]} not set in INT2CHAR."
+            )
+
+        if sym1.type != INT:
+            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in INT2CHAR")
+
+        try:
+            ret = chr(sym1.value)
+        except (ValueError, OverflowError):
+            exit_program(Status.STRING_ERR, "Expected valid value in INT2CHAR")
+
+        vm.set_var(self.op1, ret, STRING)
+
+        return self.index + 1
+
+    def _do_stri2int(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Variable not set in STRI2INT.")
+
+        if sym1.type != STRING or sym2.type != INT:
+            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in STRI2INT")
+
+        if sym2.value < 0 or sym2.value >= text_length(sym1):
+            exit_program(Status.STRING_ERR, "Invalid length in STRI2INT")
+
+        vm.set_var(self.op1, ord(char_at(sym1, sym2.value)), INT)
+
+        return self.index + 1
+
+    def _do_read(self, vm):
+        read = vm.inputs.read_line()
+
+        value = None
+        var_type = NIL
+        if read is None:
+            # missing input is nil
+            pass
+        elif self.op2 == "int":
+            try:
+                value = int(read)
+                var_type = INT
+            except ValueError:
+                pass
+        elif self.op2 == "bool":
+            value = read.lower() == "true"
+            var_type = BOOL
+        else:
+            value = read
+            var_type = STRING
+
+        vm.set_var(self.op1, value, var_type)
+
+        return self.index + 1
+
+    def _do_write(self, vm):
+        sym1 = vm.symbol(self.op1, self.op1_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR,
+                f"Can not write an uninitialized symbol {self.op1[2]}",
+            )
+
+        vm.output.write(self._to_string(sym1))
+
+        return self.index + 1
+
+    def _do_concat(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Var not set in CONCAT.")
+
+        if sym1.type != STRING or sym2.type != STRING:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in CONCAT."
+            )
+
+        dest = vm.get_var(self.op1)
+        if dest is sym1:
+            # CONCAT appending to its own variable edits the string in place
+            append_text(dest, sym2.value)
+        else:
+            dest.value = sym1.value + sym2.value
+            dest.type = STRING
+
+        return self.index + 1
+
+    def _do_strlen(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+
+        if sym1.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Missing value in STRLEN.")
+
+        if sym1.type != STRING:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in STRLEN."
+            )
+
+        vm.set_var(self.op1, text_length(sym1), INT)
+
+        return self.index + 1
+
+    def _do_getchar(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Var not set in GETCHAR.")
+
+        if sym1.type != STRING or sym2.type != INT:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in GETCHAR."
+            )
+
+        if sym2.value >= text_length(sym1) or sym2.value < 0:
+            exit_program(Status.STRING_ERR, "Bad value in GETCHAR.")
+
+        vm.set_var(self.op1, char_at(sym1, sym2.value), STRING)
+
+        return self.index + 1
+
+    def _do_setchar(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        if sym1.type == UNSET or sym2.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Var not set in GETCHAR.")
+
+        dest = vm.get_var(self.op1)
+
+        if sym1.type != INT or sym2.type != STRING or dest.type != STRING:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Only string types allowed in SETCHAR."
+            )
+
+        position = sym1.value
+        if position < 0 or position >= text_length(dest):
+            exit_program(Status.STRING_ERR, "Bad value in SETCHAR.")
+
+        set_char(dest, position, sym2.value)
+
+        return self.index + 1
+
+    def _do_type(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+
+        vm.set_var(self.op1, TYPE_NAMES[sym1.type], STRING)
+
+        return self.index + 1
+
+    def _do_jump(self, vm):
+        return self.target
+
+    def _do_jumpifeq(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_jump_args(sym1, sym2, "JUMPIFEQ")
+
+        if sym1.type == sym2.type and sym1.value == sym2.value:
+            return self._do_jump(vm)
+        else:
+            return self.index + 1
+
+    def _do_jumpifneq(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_jump_args(sym1, sym2, "JUMPIFNEQ")
+
+        if sym1.type != sym2.type or sym1.value != sym2.value:
+            return self._do_jump(vm)
+        else:
+            return self.index + 1
+
+    def _do_exit(self, vm):
+        sym1 = vm.symbol(self.op1, self.op1_type)
+
+        if sym1.type == UNSET:
+            exit_program(Status.MISSING_VALUE_ERR, "Variable not set in EXIT.")
+
+        if sym1.type != INT:
+            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected integer value in EXIT.")
+
+        if sym1.value < 0 or sym1.value > 49:
+            exit_program(Status.VALUE_ERR, "Invalid EXIT value.")
+
+        raise ProgramExit(sym1.value)
+
+    def _do_dprint(self, vm):
+        sym1 = vm.symbol(self.op1, self.op1_type)
+
+        print(self._to_string(sym1), file=sys.stderr)
+
+        return self.index + 1
+
+    def _do_label(self, vm):
+        return self.index + 1
+
+    def _do_break(self, vm):
+        return self.index + 1
+
+    # Stack instructions follow, they pop their operands from the stack and push the result
+    def _check_stack(self, stack, count, instruction):
+        if len(stack) < count:
+            exit_program(
+                Status.MISSING_VALUE_ERR, f"Missing operands on the stack in {instruction}."
+            )
+
+    def _do_clears(self, vm):
+        vm.stack.clear()
+
+        return self.index + 1
+
+    def _do_adds(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "ADDS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not int or type(value2) is not int:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two integer operands in ADDS instruction."
+            )
+
+        stack.append(value1 + value2)
+
+        return self.index + 1
+
+    def _do_subs(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "SUBS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not int or type(value2) is not int:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two integer operands in SUBS instruction."
+            )
+
+        stack.append(value1 - value2)
+
+        return self.index + 1
+
+    def _do_muls(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "MULS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not int or type(value2) is not int:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two integer operands in MULS instruction."
+            )
+
+        stack.append(value1 * value2)
+
+        return self.index + 1
+
+    def _do_idivs(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "IDIVS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not int or type(value2) is not int:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two integer operands in IDIVS instruction."
+            )
+
+        if value2 == 0:
+            exit_program(Status.VALUE_ERR, "Division by 0 attempted.")
+
+        stack.append(value1 // value2)
+
+        return self.index + 1
+
+    def _do_relations(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, self.opcode)
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not type(value2):
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR,
+                f"Expected same types of operands in {self.opcode} instruction.",
+            )
+
+        if self.opcode != "EQS" and value1 is None:
+            exit_program(Status.MISMATCHED_TYPES_ERR, f"Nil as operand in {self.opcode}.")
+
+        stack.append(self.RELATIONS[self.opcode[:-1]](value1, value2))
+
+        return self.index + 1
+
+    def _do_ands(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "ANDS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not bool or type(value2) is not bool:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two boolean operands in ANDS instruction."
+            )
+
+        stack.append(value1 and value2)
+
+        return self.index + 1
+
+    def _do_ors(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "ORS")
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        if type(value1) is not bool or type(value2) is not bool:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected two boolean operands in ORS instruction."
+            )
+
+        stack.append(value1 or value2)
+
+        return self.index + 1
+
+    def _do_nots(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 1, "NOTS")
+
+        if type(stack[-1]) is not bool:
+            exit_program(
+                Status.MISMATCHED_TYPES_ERR, "Expected a boolean operand in NOTS instruction."
+            )
+
+        stack[-1] = not stack[-1]
+
+        return self.index + 1
+
+    def _do_int2chars(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 1, "INT2CHARS")
+
+        if type(stack[-1]) is not int:
+            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in INT2CHARS")
+
+        try:
+            stack[-1] = chr(stack[-1])
+        except (ValueError, OverflowError):
+            exit_program(Status.STRING_ERR, "Expected valid value in INT2CHARS")
+
+        return self.index + 1
+
+    def _do_stri2ints(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, "STRI2INTS")
+
+        position = stack.pop()
+        text = stack.pop()
+        if type(text) is not str or type(position) is not int:
+            exit_program(Status.MISMATCHED_TYPES_ERR, "Expected valid type in STRI2INTS")
+
+        if position < 0 or position >= len(text):
+            exit_program(Status.STRING_ERR, "Invalid length in STRI2INTS")
+
+        stack.append(ord(text[position]))
+
+        return self.index + 1
+
+    # pops the operands of JUMPIFEQS or JUMPIFNEQS and returns whether they are equal
+    def _pop_jump_args(self, vm):
+        stack = vm.stack
+        self._check_stack(stack, 2, self.opcode)
+
+        value2 = stack.pop()
+        value1 = stack.pop()
+        same_type = type(value1) is type(value2)
+        if not same_type and value1 is not None and value2 is not None:
+            exit_program(Status.MISMATCHED_TYPES_ERR, f"Wrong types in {self.opcode}")
+
+        return same_type and value1 == value2
+
+    def _do_jumpifeqs(self, vm):
+        if self._pop_jump_args(vm):
+            return self._do_jump(vm)
+        else:
+            return self.index + 1
+
+    def _do_jumpifneqs(self, vm):
+        if not self._pop_jump_args(vm):
+            return self._do_jump(vm)
+        else:
+            return self.index + 1
+
+    # Fused superinstructions follow, each of them executes a whole sequence of instructions
+    def _do_createframe_pushframe(self, vm):
+        vm.release_frame(vm.frames[TEMPORARY])
+        frame = vm.new_frame()
+
+        vm.LF.append(frame)
+        vm.frames[LOCAL] = frame
+        vm.frames[TEMPORARY] = None
+
+        return self.next_index
+
+    def _do_createframe_pushframe_call(self, vm):
+        self._do_createframe_pushframe(vm)
+
+        # the call can be a tail call
+        return self.sequence[2].execute(vm)
+
+    def _do_createframe_defvars(self, vm):
+        vm.release_frame(vm.frames[TEMPORARY])
+        frame = vm.new_frame()
+        vm.frames[TEMPORARY] = frame
+
+        # all the variables are in the new temporary frame
+        for defvar in self.sequence[1:]:
+            frame.insert_var(defvar.op1[1], defvar.op1[2])
+
+        return self.next_index
+
+    def _do_defvars(self, vm):
+        for defvar in self.sequence:
+            var = defvar.op1
+            frame = vm.frames[var[0]]
+            if frame is None:
+                vm.missing_frame(var[0])
+
+            frame.insert_var(var[1], var[2])
+
+        return self.next_index
+
+    def _do_defvar_move(self, vm):
+        frame = vm.frames[self.op1[0]]
+        if frame is None:
+            vm.missing_frame(self.op1[0])
+
+        frame.insert_var(self.op1[1], self.op1[2])
+
+        move = self.sequence[1]
+        sym1 = vm.symbol(move.op2, move.op2_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR,
+                f"Var {move.op2[2]} has to be set before assingning.",
+            )
+
+        cell = frame[self.op1[1]]
+        cell.value = sym1.value
+        cell.type = sym1.type
+
+        return self.next_index
+
+    def _do_pushs_pops(self, vm):
+        sym1 = vm.symbol(self.op1, self.op1_type)
+
+        if sym1.type == UNSET:
+            exit_program(
+                Status.MISSING_VALUE_ERR, f"Variable {self.op1[2]} not set in PUSHS."
+            )
+
+        # the pushed value is popped right away, so the stack is not used at all
+        vm.set_var(self.sequence[1].op1, sym1.value, sym1.type)
+
+        return self.next_index
+
+    def _do_relation_jump(self, vm):
+        sym1 = vm.symbol(self.op2, self.op2_type)
+        sym2 = vm.symbol(self.op3, self.op3_type)
+
+        self._check_relation_args(sym1, sym2, self.opcode)
+
+        result = self.RELATIONS[self.opcode](sym1.value, sym2.value)
+        vm.set_var(self.op1, result, BOOL)
+
+        # the conditional jump compares the result with a boolean literal
+        if result == self.branch_on:
+            return self.sequence[1].target
+        else:
+            return self.next_index
+
+    def _do_popframe_return(self, vm):
+        self._do_popframe(vm)
+
+        return self.sequence[1]._do_return(vm)
+
+    # Specialized handlers follow, the operand cells exist and have the right types,
+    # they are taken from the cells the VM keeps for the instruction
+    def _do_add_int(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value + cell3.value
+        cell1.type = INT
+        return self.index + 1
+
+    def _do_sub_int(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value - cell3.value
+        cell1.type = INT
+        return self.index + 1
+
+    def _do_mul_int(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value * cell3.value
+        cell1.type = INT
+        return self.index + 1
+
+    def _do_idiv_int(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        if cell3.value == 0:
+            exit_program(Status.VALUE_ERR, "Division by 0 attempted.")
+
+        cell1.value = cell2.value // cell3.value
+        cell1.type = INT
+        return self.index + 1
+
+    def _do_relation_typed(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = self.RELATIONS[self.opcode](cell2.value, cell3.value)
+        cell1.type = BOOL
+        return self.index + 1
+
+    def _do_and_bool(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value and cell3.value
+        cell1.type = BOOL
+        return self.index + 1
+
+    def _do_or_bool(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value or cell3.value
+        cell1.type = BOOL
+        return self.index + 1
+
+    def _do_not_bool(self, vm):
+        cell1, cell2, _ = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = not cell2.value
+        cell1.type = BOOL
+        return self.index + 1
+
+    def _do_concat_string(self, vm):
+        cell1, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        if cell1 is cell2:
+            append_text(cell1, cell3.value)
+        else:
+            cell1.value = cell2.value + cell3.value
+            cell1.type = STRING
+        return self.index + 1
+
+    def _do_strlen_string(self, vm):
+        cell1, cell2, _ = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = text_length(cell2)
+        cell1.type = INT
+        return self.index + 1
+
+    def _do_move_set(self, vm):
+        cell1, cell2, _ = vm.cells[self.index] or self._bind_cells(vm)
+        cell1.value = cell2.value
+        cell1.type = cell2.type
+        return self.index + 1
+
+    def _do_jumpifeq_typed(self, vm):
+        _, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        if cell2.value == cell3.value:
+            return self.target
+        return self.index + 1
+
+    def _do_jumpifneq_typed(self, vm):
+        _, cell2, cell3 = vm.cells[self.index] or self._bind_cells(vm)
+        if cell2.value != cell3.value:
+            return self.target
+        return self.index + 1
+
+    # maps the opcodes to their specialized handlers
+    SPECIALIZED = {
+        "ADD": _do_add_int,
+        "SUB": _do_sub_int,
+        "MUL": _do_mul_int,
+        "IDIV": _do_idiv_int,
+        "LT": _do_relation_typed,
+        "GT": _do_relation_typed,
+        "EQ": _do_relation_typed,
+        "AND": _do_and_bool,
+        "OR": _do_or_bool,
+        "NOT": _do_not_bool,
+        "CONCAT": _do_concat_string,
+        "STRLEN": _do_strlen_string,
+        "MOVE": _do_move_set,
+        "JUMPIFEQ": _do_jumpifeq_typed,
+        "JUMPIFNEQ": _do_jumpifneq_typed,
+    }
+
+    # maps the relation opcodes to their operators
+    RELATIONS = {"LT": operator.lt, "GT": operator.gt, "EQ": operator.eq}
+
+    # maps each opcode to the method interpreting it
+    HANDLERS = {
+        "MOVE": _do_move,
+        "CREATEFRAME": _do_createframe,
+        "PUSHFRAME": _do_pushframe,
+        "POPFRAME": _do_popframe,
+        "DEFVAR": _do_defvar,
+        "CALL": _do_call,
+        "RETURN": _do_return,
+        "PUSHS": _do_pushs,
+        "POPS": _do_pops,
+        "ADD": _do_add,
+        "MUL": _do_mul,
+        "SUB": _do_sub,
+        "IDIV": _do_idiv,
+        "LT": _do_lt,
+        "GT": _do_gt,
+        "EQ": _do_eq,
+        "AND": _do_and,
+        "OR": _do_or,
+        "NOT": _do_not,
+        "INT2CHAR": _do_int2char,
+        "STRI2INT": _do_stri2int,
+        "READ": _do_read,
+        "WRITE": _do_write,
+        "CONCAT": _do_concat,
+        "STRLEN": _do_strlen,
+        "GETCHAR": _do_getchar,
+        "SETCHAR": _do_setchar,
+        "TYPE": _do_type,
+        "LABEL": _do_label,
+        "JUMP": _do_jump,
+        "JUMPIFEQ": _do_jumpifeq,
+        "JUMPIFNEQ": _do_jumpifneq,
+        "EXIT": _do_exit,
+        "DPRINT": _do_dprint,
+        "BREAK": _do_break,
+        "CLEARS": _do_clears,
+        "ADDS": _do_adds,
+        "SUBS": _do_subs,
+        "MULS": _do_muls,
+        "IDIVS": _do_idivs,
+        "LTS": _do_relations,
+        "GTS": _do_relations,
+        "EQS": _do_relations,
+        "ANDS": _do_ands,
+        "ORS": _do_ors,
+        "NOTS": _do_nots,
+        "INT2CHARS": _do_int2chars,
+        "STRI2INTS": _do_stri2ints,
+        "JUMPIFEQS": _do_jumpifeqs,
+        "JUMPIFNEQS": _do_jumpifneqs,
+    }
+
+    # a return index on the call stack is increased by this for each POPFRAME pending for it
+    PENDING_POPFRAME = 1 << 32
+
+    # opcodes of the instructions jumping to their label
+    JUMP_OPCODES = frozenset(
+        ("JUMP", "CALL", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+    )
+
+    # opcodes of the stack instructions without operands
+    STACK_OPCODES = frozenset(
+        (
+            "CLEARS",
+            "ADDS",
+            "SUBS",
+            "MULS",
+            "IDIVS",
+            "LTS",
+            "GTS",
+            "EQS",
+            "ANDS",
+            "ORS",
+            "NOTS",
+            "INT2CHARS",
+            "STRI2INTS",
+        )
+    )
+
+    # kinds of the operands of each opcode, all of them are required
+    OPERANDS = {
+        "MOVE": ("var", "symb"),
+        "CREATEFRAME": (),
+        "PUSHFRAME": (),
+        "POPFRAME": (),
+        "DEFVAR": ("var",),
+        "CALL": ("label",),
+        "RETURN": (),
+        "PUSHS": ("symb",),
+        "POPS": ("var",),
+        "ADD": ("var", "symb", "symb"),
+        "SUB": ("var", "symb", "symb"),
+        "MUL": ("var", "symb", "symb"),
+        "IDIV": ("var", "symb", "symb"),
+        "LT": ("var", "symb", "symb"),
+        "GT": ("var", "symb", "symb"),
+        "EQ": ("var", "symb", "symb"),
+        "AND": ("var", "symb", "symb"),
+        "OR": ("var", "symb", "symb"),
+        "NOT": ("var", "symb"),
+        "INT2CHAR": ("var", "symb"),
+        "STRI2INT": ("var", "symb", "symb"),
+        "READ": ("var", "type"),
+        "WRITE": ("symb",),
+        "CONCAT": ("var", "symb", "symb"),
+        "STRLEN": ("var", "symb"),
+        "GETCHAR": ("var", "symb", "symb"),
+        "SETCHAR": ("var", "symb", "symb"),
+        "TYPE": ("var", "symb"),
+        "LABEL": ("label",),
+        "JUMP": ("label",),
+        "JUMPIFEQ": ("label", "symb", "symb"),
+        "JUMPIFNEQ": ("label", "symb", "symb"),
+        "EXIT": ("symb",),
+        "DPRINT": ("symb",),
+        "BREAK": (),
+        "CLEARS": (),
+        "ADDS": (),
+        "SUBS": (),
+        "MULS": (),
+        "IDIVS": (),
+        "LTS": (),
+        "GTS": (),
+        "EQS": (),
+        "ANDS": (),
+        "ORS": (),
+        "NOTS": (),
+        "INT2CHARS": (),
+        "STRI2INTS": (),
+        "JUMPIFEQS": ("label",),
+        "JUMPIFNEQS": ("label",),
+    }
+
+    # validates the instruction, it's argument count and types if possible
+    def validate(self, tree):
+        if self.opcode == "MOVE":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "CREATEFRAME":
+            pass
+        elif self.opcode == "PUSHFRAME":
+            pass
+        elif self.opcode == "POPFRAME":
+            pass
+        elif self.opcode == "DEFVAR":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "CALL":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "RETURN":
+            pass
+        elif self.opcode == "PUSHS":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] != "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "POPS":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "ADD":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "SUB":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "MUL":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "IDIV":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "LT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "GT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "EQ":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "AND":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "OR":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "NOT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "INT2CHAR":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "STRI2INT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "READ":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] == "type":
+                    if (
+                        element.text != "int"
+                        and element.text != "string"
+                        and element.text != "bool"
+                    ):
+                        exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "WRITE":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] != "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "CONCAT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "STRLEN":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "GETCHAR":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "SETCHAR":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "TYPE":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "var":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "LABEL":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "JUMP":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "JUMPIFEQ":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "JUMPIFNEQ":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                elif element.tag == "arg2" and element.attrib["type"] != "label":
+                    self.op2 = element.text
+                    self.op2_type = element.attrib["type"]
+                elif element.tag == "arg3" and element.attrib["type"] != "label":
+                    self.op3 = element.text
+                    self.op3_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "EXIT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] != "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "DPRINT":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] != "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "BREAK":
+            pass
+        elif self.opcode in self.STACK_OPCODES:
+            # the operands are on the stack
+            for element in tree:
+                exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        elif self.opcode == "JUMPIFEQS" or self.opcode == "JUMPIFNEQS":
+            for element in tree:
+                if element.tag == "arg1" and element.attrib["type"] == "label":
+                    self.op1 = element.text
+                    self.op1_type = element.attrib["type"]
+                else:
+                    exit_program(Status.INVALID_XML_ERR, "Invalid XML.")
+        else:
+            exit_program(Status.INVALID_XML_ERR, "Unexpected opcode.")
+
+        # a missing operand would reach the handlers as an empty string
+        operand_types = (self.op1_type, self.op2_type, self.op3_type)
+        if "" in operand_types[: len(self.OPERANDS[self.opcode])]:
+            exit_program(Status.INVALID_XML_ERR, f"Missing operand of {self.opcode}.")
+
+        # literals are decoded only once
+        self.op1 = self._decode_literal(self.op1, self.op1_type)
+        self.op2 = self._decode_literal(self.op2, self.op2_type)
+        self.op3 = self._decode_literal(self.op3, self.op3_type)
@@ -1,141 +1,187 @@
-"""
-IPP - Project 2
-Author: Roman Janota
-Date: 16-04-2023
-"""
-
-import argparse
-import xml.etree.ElementTree as ET
-import frame
-from status import *
-from instruction import *
-import os
-
-
-# finds the instruction in the instructions array based on order
-def find_instruction(instructions, order):
-    for instruction in instructions:
-        if instruction.order == order:
-            return instruction
-    return None
-
-
-# checks order duplicity in the XML, it is forbidden
-def check_order_duplicity(root):
-    orders = []
-
-    for child in root:
-        if child.tag != "instruction":
-            exit_program(Status.INVALID_XML_ERR, "Expected instruction element.")
-
-        if "order" not in child.attrib:
-            exit_program(Status.INVALID_XML_ERR, "Missing order attribute.")
-        if "opcode" not in child.attrib:
-            exit_program(Status.INVALID_XML_ERR, "Missing opcode attribute.")
-
-        order = child.attrib["order"]
-        if not order.isnumeric():
-            exit_program(Status.INVALID_XML_ERR, "Non integer order.")
-
-        order = int(order)
-        if order < 0:
-            exit_program(Status.INVALID_XML_ERR, "Negative order attribute.")
-
-        for i in range(len(orders)):
-            if orders[i] == order:
-                exit_program(Status.INVALID_XML_ERR, "Duplicate order found.")
-
-        orders.append(order)
-
-
-def main():
-    # parse arguments
-    parser = argparse.ArgumentParser(description="Interpreter for IPPcode23.")
-    parser.add_argument("--source", help="IPPcode23 source code file.")
-    parser.add_argument("--input", help="File with inputs for the source file.")
-    args = vars(parser.parse_args())
-
-    if args["input"] is None and args["source"] is None:
-        exit_program(MISSING_PARAM_ERR, "Missing both parameters.")
-    elif args["input"] is None:
-        input_f = sys.stdin
-        source_f = args["source"]
-    elif args["source"] is None:
-        input_f = args["input"]
-        source_f = sys.stdin
-    else:
-        input_f = args["input"]
-        source_f = args["source"]
-
-    if input_f != sys.stdin and not os.path.isfile(input_f):
-        exit_program(Status.INPUT_FILE_ERR, "Unable to open input file.")
-
-    if source_f != sys.stdin and not os.path.isfile(source_f):
-        exit_program(Status.INPUT_FILE_ERR, "Unable to open source file.")
-
-    # parse the XML
-    try:
-        tree = ET.parse(source_f)
-    except:
-        exit_program(Status.MALFORMED_ERR, "Unable to parse XML.")
-
-    # get the root element
-    root = tree.getroot()
-    if root.tag != "program":
-        exit_program(Status.INVALID_XML_ERR, "Expected program as root element.")
-
-    # check the order duplicity
-    check_order_duplicity(root)
-
-    # validate each instruction element and append it to the array
-    instructions = []
-    for child in root:
-        instruction = Instruction(child, input_f)
-        instruction.validate(child)
-        instructions.append(instruction)
-
-    # create all the labels
-    for instruction in instructions:
-        instruction.create_labels()
-        Instruction.labels = instruction.labels
-
-    # find the minimum and maximum order of the instructions
-    max_order = 0
-    min_order = sys.maxsize
-    for instruction in instructions:
-        if instruction.order > max_order:
-            max_order = instruction.order
-        if instruction.order < min_order:
-            min_order = instruction.order
-
-    order = min_order
-    while order <= max_order:
-        # find the instruction with the given order
-        instruction = find_instruction(instructions, order)
-        if instruction is None:
-            # order can have holes, meaning there can be order 1 and then order 3
-            order = order + 1
-            if order > max_order:
-                break
-            continue
-
-        # execute the given instruction
-        order = instruction.execute()
-
-        # set the new values of static class variables for every instruction
-        Instruction.GF = instruction.GF
-        Instruction.TF = instruction.TF
-        Instruction.LF = instruction.LF
-        Instruction.stack = instruction.stack
-        Instruction.inputs = instruction.inputs
-        Instruction.labels = instruction.labels
-        Instruction.call_stack = instruction.call_stack
-
-        if order > max_order:
-            break
-
-    exit_program(Status.OK, None)
-
-
-if __name__ == "__main__":
-    main()
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import argparse
+from status import *
+from program import *
+from loader import *
+from reader import *
+from writer import *
+import os
+
+
+def main():
+    # parse arguments
+    parser = argparse.ArgumentParser(description="Interpreter for IPPcode23.")
+    parser.add_argument("--source", help="IPPcode23 source code file.")
+    parser.add_argument("--input", help="File with inputs for the source file.")
+    parser.add_argument(
+        "--ippcode",
+        action="store_true",
+        help="The source is IPPcode23 text instead of its XML representation.",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Map the input file into memory instead of reading it through a buffer.",
+    )
+    parser.add_argument("--output", help="File for the output of the source file.")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse the validated program from the cache if the source did not change.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory of the program cache, defaults to $IPP_CACHE_DIR or ~/.cache/ipp.",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Fold constants, remove dead code and fuse common sequences of instructions.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print a summary of the optimizations to the standard error output.",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Translate the program to Python and run it instead of interpreting it.",
+    )
+    parser.add_argument(
+        "--compile-output",
+        help="File for the Python source of the compiled program.",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Measure the instructions and write the report to this JSON file.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        help="Number of rows of the profile tables printed to the standard error output.",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=Writer.BUFFER_SIZE,
+        help="Number of output characters buffered before they are written.",
+    )
+    parser.add_argument(
+        "--writer-thread",
+        action="store_true",
+        help="Write the output from a background thread.",
+    )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Run the jobs framed on the standard input and answer them on the standard output.",
+    )
+    parser.add_argument("--socket", help="Run the jobs of the connections of this Unix socket.")
+    parser.add_argument(
+        "--workers", type=int, help="Number of worker processes, the number of CPUs by default."
+    )
+    parser.add_argument(
+        "--recycle",
+        type=int,
+        help="Jobs run by a worker process before it is replaced.",
+    )
+    args = vars(parser.parse_args())
+
+    # the modules of the optional features are imported only when they are used,
+    # because starting the interpreter takes most of the time of small programs
+    if args["server"] or args["socket"] is not None:
+        from server import Server
+
+        # the server runs the jobs until its input or its socket is closed
+        Server(args["workers"], args["recycle"]).serve(args["socket"])
+        exit_program(Status.OK, None)
+
+    if args["input"] is None and args["source"] is None:
+        exit_program(Status.MISSING_PARAM_ERR, "Missing both parameters.")
+    elif args["input"] is None:
+        input_f = sys.stdin
+        source_f = args["source"]
+    elif args["source"] is None:
+        input_f = args["input"]
+        source_f = sys.stdin
+    else:
+        input_f = args["input"]
+        source_f = args["source"]
+
+    # the profiler runs the program by its own loop, so it can not run the compiled program
+    if args["profile"] is not None and (args["compile"] or args["compile_output"] is not None):
+        exit_program(
+            Status.MISSING_PARAM_ERR,
+            "The --profile argument can not be combined with --compile or --compile-output.",
+        )
+
+    if input_f != sys.stdin and not os.path.isfile(input_f):
+        exit_program(Status.INPUT_FILE_ERR, "Unable to open input file.")
+
+    if source_f != sys.stdin and not os.path.isfile(source_f):
+        exit_program(Status.INPUT_FILE_ERR, "Unable to open source file.")
+
+    # load the program from the XML or the IPPcode23 text or from the cache
+    loader = Loader
+    if args["ippcode"]:
+        from textloader import TextLoader
+
+        loader = TextLoader
+    if args["cache"]:
+        from cache import Cache
+
+        program = Cache(args["cache_dir"]).load(source_f, loader)
+    else:
+        program = loader(source_f).load()
+
+    # the cache holds the programs as loaded, so they are optimized after it
+    if args["optimize"]:
+        from optimizer import Optimizer
+
+        optimizer = Optimizer(program)
+        program = optimizer.optimize()
+        if args["stats"]:
+            print(optimizer.report(), file=sys.stderr)
+
+    # the output of WRITE goes through a single buffered writer
+    try:
+        output = Writer(args["output"], args["buffer_size"], args["writer_thread"])
+    except OSError:
+        exit_program(Status.OUTPUT_FILE_ERR, "Unable to open output file.")
+
+    # the compiled program runs instead of the loop, very large programs are always interpreted
+    runner = None
+    profiler = None
+    if args["profile"] is not None:
+        from profiler import Profiler
+
+        # the profiler measures the instructions in its own loop
+        profiler = Profiler(program, args["profile_top"])
+        runner = profiler.run
+    elif args["compile"] or args["compile_output"] is not None:
+        from compiler import Compiler
+
+        program.compiled = Compiler(program).compile(args["compile_output"])
+        if program.compiled is None:
+            print(
+                f"The program has more than {Compiler.MAX_INSTRUCTIONS} instructions, "
+                "so it is interpreted instead of compiled.",
+                file=sys.stderr,
+            )
+
+    # a single input source is shared by every READ instruction, the output is flushed at the end
+    # and a failed write is reported by exit code 12, unless the program already ended by an error
+    result = program.run(Reader(input_f, args["mmap"]), output, runner)
+    if profiler is not None:
+        profiler.write(args["profile"])
+    raise ProgramExit(result.code, result.error)
+
+
+if __name__ == "__main__":
+    run_main(main)
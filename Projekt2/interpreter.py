@@ -0,0 +1,57 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import io
+from status import *
+from loader import *
+from program import *
+
+"""
+Interpreter objects embed the interpreter into another Python program.
+They load programs with the options of the command line, a loaded program is then run by its method run
+as many times as needed, each time with another input. An error of loading is raised as ProgramExit,
+an error of the program or EXIT ends only its run and is returned in the result.
+"""
+
+
+class Interpreter:
+    def __init__(self, ippcode=False, optimize=False, compile=False, cache=False, cache_dir=None):
+        self.ippcode = ippcode  # the sources are IPPcode23 text instead of XML
+        self.optimize = optimize  # optimize the loaded programs
+        self.compile = compile  # translate the loaded programs to Python
+        self.cache = cache  # reuse the validated programs from the cache
+        self.cache_dir = cache_dir  # directory of the program cache
+
+    # loads the source given by its path, its content as bytes or a binary stream
+    def load(self, source):
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        # the modules of the optional features are imported only when they are used
+        loader = Loader
+        if self.ippcode:
+            from textloader import TextLoader
+
+            loader = TextLoader
+        if self.cache:
+            from cache import Cache
+
+            if source != sys.stdin and not isinstance(source, (str, io.BytesIO)):
+                # the key of the cache is computed from the whole content
+                source = io.BytesIO(source.read())
+            program = Cache(self.cache_dir).load(source, loader)
+        else:
+            program = loader(source).load()
+
+        if self.optimize:
+            from optimizer import Optimizer
+
+            program = Optimizer(program).optimize()
+        if self.compile:
+            from compiler import Compiler
+
+            program.compiled = Compiler(program).compile()
+        return program
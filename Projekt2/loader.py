@@ -0,0 +1,115 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import sys
+from status import *
+from instruction import *
+from program import *
+
+"""
+Loader objects read the XML source as a stream of parser events.
+Each instruction element is validated and converted to an instruction object as soon as it is read,
+then it is discarded, so the whole document is never kept in memory.
+"""
+
+
+class Loader:
+    ARG_TYPES = LITERAL_TYPES | {"var", "label", "type"}  # types of the operand elements
+
+    def __init__(self, source):
+        self.source = source  # path to the source file or sys.stdin
+        self.orders = set()  # orders of the instructions read so far
+
+    # checks the instruction element's attributes, order duplicity is forbidden
+    def _check_element(self, element):
+        if element.tag != "instruction":
+            exit_program(Status.INVALID_XML_ERR, "Expected instruction element.")
+
+        if "order" not in element.attrib:
+            exit_program(Status.INVALID_XML_ERR, "Missing order attribute.")
+        if "opcode" not in element.attrib:
+            exit_program(Status.INVALID_XML_ERR, "Missing opcode attribute.")
+
+        order = element.attrib["order"]
+        if not order.isnumeric():
+            exit_program(Status.INVALID_XML_ERR, "Non integer order.")
+
+        order = int(order)
+        if order < 0:
+            exit_program(Status.INVALID_XML_ERR, "Negative order attribute.")
+
+        if order in self.orders:
+            exit_program(Status.INVALID_XML_ERR, "Duplicate order found.")
+
+        self.orders.add(order)
+
+        # the operands need a known type, the instruction reads it without checking
+        for arg in element:
+            if "type" not in arg.attrib:
+                exit_program(Status.INVALID_XML_ERR, "Missing type attribute.")
+            if arg.attrib["type"] not in self.ARG_TYPES:
+                exit_program(Status.INVALID_XML_ERR, f"Invalid type attribute {arg.attrib['type']}.")
+
+    # reads the rest of the document, so a malformed XML is reported first
+    def _drain(self, events):
+        import xml.etree.ElementTree as ET
+
+        try:
+            for event in events:
+                pass
+        except ET.ParseError:
+            exit_program(Status.MALFORMED_ERR, "Unable to parse XML.")
+
+    # reads the source and returns the loaded program
+    def load(self):
+        # the XML parser is not needed when the program comes from the cache
+        import xml.etree.ElementTree as ET
+
+        source = self.source
+        if source == sys.stdin:
+            source = sys.stdin.buffer
+
+        # the literals are pooled while the instructions are read, so equal ones are stored once
+        program = Program()
+        instructions = []
+        events = ET.iterparse(source, events=("start", "end"))
+        try:
+            # get the root element
+            event, root = next(events)
+            if root.tag != "program":
+                exit_program(
+                    Status.INVALID_XML_ERR, "Expected program as root element."
+                )
+
+            depth = 1
+            for event, element in events:
+                if event == "start":
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                # validate each instruction element and append it to the array
+                self._check_element(element)
+                instruction = Instruction(element)
+                instruction.validate(element)
+                instruction.resolve_constants(program)
+                instructions.append(instruction)
+
+                # the element is not needed anymore
+                root.clear()
+        except ProgramExit:
+            self._drain(events)
+            raise
+        except ET.ParseError:
+            exit_program(Status.MALFORMED_ERR, "Unable to parse XML.")
+
+        # sort the instructions by order, holes in the order are dropped
+        program.place(instructions)
+        program.link()
+        return program
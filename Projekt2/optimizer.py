@@ -0,0 +1,385 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+from status import *
+from frame import *
+from instruction import *
+from analyzer import *
+
+"""
+Optimizer objects rewrite a loaded program before it is executed.
+Constant expressions are folded, unreachable instructions are removed and common sequences
+of instructions are fused into superinstructions executed by a single handler,
+so the interpreter loop dispatches fewer instructions. Instructions whose operand types are
+proven by the type analysis get handlers without the checks.
+"""
+
+
+class Optimizer:
+    RELATIONS = frozenset(("LT", "GT", "EQ"))  # opcodes fused with a following conditional jump
+    JUMPS = frozenset(("JUMPIFEQ", "JUMPIFNEQ"))  # conditional jumps fused with a relation
+    READS_FIRST = frozenset(("WRITE", "PUSHS", "EXIT", "DPRINT"))  # opcodes reading their var
+    FRAME_OPCODES = frozenset(("CREATEFRAME", "PUSHFRAME", "POPFRAME"))  # change LF and TF
+    BRANCHES = frozenset(
+        ("JUMP", "CALL", "JUMPIFEQ", "JUMPIFNEQ", "JUMPIFEQS", "JUMPIFNEQS")
+    )  # opcodes with a label
+    ENDS = frozenset(("JUMP", "RETURN", "EXIT"))  # opcodes never followed by the next one
+
+    # types of both operands required by the specialized handlers
+    OPERAND_TYPES = {
+        "ADD": 1 << INT,
+        "SUB": 1 << INT,
+        "MUL": 1 << INT,
+        "IDIV": 1 << INT,
+        "AND": 1 << BOOL,
+        "OR": 1 << BOOL,
+        "NOT": 1 << BOOL,
+        "CONCAT": 1 << STRING,
+        "STRLEN": 1 << STRING,
+    }
+    # types compared by the specialized handlers of relations and conditional jumps
+    COMPARED_TYPES = {
+        "LT": frozenset((1 << INT, 1 << BOOL, 1 << STRING)),
+        "GT": frozenset((1 << INT, 1 << BOOL, 1 << STRING)),
+        "EQ": frozenset((1 << INT, 1 << BOOL, 1 << STRING, 1 << NIL)),
+        "JUMPIFEQ": frozenset((1 << INT, 1 << BOOL, 1 << STRING, 1 << NIL)),
+        "JUMPIFNEQ": frozenset((1 << INT, 1 << BOOL, 1 << STRING, 1 << NIL)),
+    }
+
+    def __init__(self, program):
+        self.program = program  # program being optimized
+        self.folded = 0  # number of folded instructions
+        self.removed = 0  # number of removed instructions
+        self.fused = 0  # number of fused sequences
+        self.specialized = 0  # number of instructions with specialized handlers
+        self.checked = set()  # instructions with specialized handlers
+
+    # runs the optimization passes and returns the optimized program
+    def optimize(self):
+        self._fold_constants()
+        self._remove_dead_code()
+        self._specialize()
+        self._fuse_sequences()
+        return self.program
+
+    # returns a summary of the optimizations
+    def report(self):
+        return (
+            f"Folded {self.folded} and removed {self.removed} instructions, "
+            f"fused {self.fused} sequences, specialized {self.specialized} instructions."
+        )
+
+    # folds the instructions with constant operands, constants are propagated inside basic blocks
+    def _fold_constants(self):
+        instructions = []
+        known = {}  # maps the resolved variables to the constant cells they hold
+        for instruction in self.program.instructions:
+            opcode = instruction.opcode
+            if opcode == "LABEL":
+                # other paths can join here
+                known.clear()
+
+            self._propagate(instruction, known)
+
+            result = self._fold(instruction)
+            if result is not None:
+                constant = self.program.resolve_constant(Var(*result))
+                instruction.rewrite("MOVE", constant, TYPE_NAMES[result[1]])
+                self.folded += 1
+            elif opcode in self.JUMPS:
+                taken = self._fold_jump(instruction)
+                if taken is not None:
+                    self.folded += 1
+                    if not taken:
+                        # the jump falls through, so it is removed
+                        self.removed += 1
+                        continue
+                    instruction.rewrite("JUMP")
+
+            self._update(instruction, known)
+            instructions.append(instruction)
+
+        if len(instructions) < len(self.program.instructions):
+            self.program.relink(instructions)
+
+    # replaces the variable operands holding known constants by the constants
+    def _propagate(self, instruction, known):
+        if instruction.opcode in self.READS_FIRST and instruction.op1_type == "var":
+            instruction.op1, instruction.op1_type = self._constant(
+                known, instruction.op1, instruction.op1_type
+            )
+        instruction.op2, instruction.op2_type = self._constant(
+            known, instruction.op2, instruction.op2_type
+        )
+        instruction.op3, instruction.op3_type = self._constant(
+            known, instruction.op3, instruction.op3_type
+        )
+
+    # returns the constant cell held by the variable operand and its type, or the operand
+    def _constant(self, known, op, op_type):
+        if op_type == "var":
+            cell = known.get(op)
+            if cell is not None:
+                return cell, TYPE_NAMES[cell.type]
+        return op, op_type
+
+    # records the constants held by the variables after the instruction
+    def _update(self, instruction, known):
+        opcode = instruction.opcode
+        if opcode in self.FRAME_OPCODES:
+            # the local and temporary variables now refer to other frames
+            for var in list(known):
+                if var[0] != GLOBAL:
+                    del known[var]
+        elif opcode == "CALL" or opcode in self.ENDS:
+            # a function can change any variable
+            known.clear()
+        elif instruction.op1_type == "var" and opcode not in self.READS_FIRST:
+            if opcode == "MOVE" and instruction.op2_type in LITERAL_TYPES:
+                known[instruction.op1] = instruction.op2
+            else:
+                known.pop(instruction.op1, None)
+
+    # returns the value and type of the result if the operands are constants, otherwise None
+    def _fold(self, instruction):
+        opcode = instruction.opcode
+        if instruction.op2_type not in LITERAL_TYPES:
+            return None
+        sym1 = instruction.op2
+
+        # unary instructions
+        if opcode == "NOT":
+            if sym1.type == BOOL:
+                return (not sym1.value, BOOL)
+            return None
+        if opcode == "STRLEN":
+            if sym1.type == STRING:
+                return (len(sym1.value), INT)
+            return None
+        if opcode == "INT2CHAR":
+            if sym1.type == INT and 0 <= sym1.value <= 0x10FFFF:
+                return (chr(sym1.value), STRING)
+            return None
+        if opcode == "TYPE":
+            return (TYPE_NAMES[sym1.type], STRING)
+
+        if instruction.op3_type not in LITERAL_TYPES:
+            return None
+        sym2 = instruction.op3
+
+        # binary instructions, the ones that would fail are left to fail at run time
+        if opcode in ("ADD", "SUB", "MUL", "IDIV"):
+            if sym1.type != INT or sym2.type != INT:
+                return None
+            if opcode == "ADD":
+                return (sym1.value + sym2.value, INT)
+            if opcode == "SUB":
+                return (sym1.value - sym2.value, INT)
+            if opcode == "MUL":
+                return (sym1.value * sym2.value, INT)
+            if sym2.value == 0:
+                return None
+            return (sym1.value // sym2.value, INT)
+        if opcode in self.RELATIONS:
+            if sym1.type != sym2.type or (opcode != "EQ" and sym1.type == NIL):
+                return None
+            return (Instruction.RELATIONS[opcode](sym1.value, sym2.value), BOOL)
+        if opcode in ("AND", "OR"):
+            if sym1.type != BOOL or sym2.type != BOOL:
+                return None
+            if opcode == "AND":
+                return (sym1.value and sym2.value, BOOL)
+            return (sym1.value or sym2.value, BOOL)
+        if opcode == "CONCAT":
+            if sym1.type != STRING or sym2.type != STRING:
+                return None
+            return (sym1.value + sym2.value, STRING)
+        if opcode in ("GETCHAR", "STRI2INT"):
+            if sym1.type != STRING or sym2.type != INT:
+                return None
+            if sym2.value < 0 or sym2.value >= len(sym1.value):
+                return None
+            if opcode == "GETCHAR":
+                return (sym1.value[sym2.value], STRING)
+            return (ord(sym1.value[sym2.value]), INT)
+
+        return None
+
+    # returns whether the conditional jump with constant operands is taken, otherwise None
+    def _fold_jump(self, instruction):
+        if (
+            instruction.op2_type not in LITERAL_TYPES
+            or instruction.op3_type not in LITERAL_TYPES
+        ):
+            return None
+
+        # jumps that would fail are left to fail at run time
+        sym1 = instruction.op2
+        sym2 = instruction.op3
+        if sym1.type != sym2.type and sym1.type != NIL and sym2.type != NIL:
+            return None
+
+        equal = sym1.type == sym2.type and sym1.value == sym2.value
+        return equal if instruction.opcode == "JUMPIFEQ" else not equal
+
+    # removes the instructions that can not be reached from the start of the program
+    def _remove_dead_code(self):
+        instructions = self.program.instructions
+        reachable = [False] * len(instructions)
+        pending = [0]
+        while pending:
+            index = pending.pop()
+            if index >= len(instructions) or reachable[index]:
+                continue
+            reachable[index] = True
+
+            instruction = instructions[index]
+            if instruction.opcode in self.BRANCHES:
+                pending.append(instruction.target)
+            if instruction.opcode not in self.ENDS:
+                # a call returns to the next instruction
+                pending.append(index + 1)
+
+        # the labels are kept, so the jumps to them do not change
+        kept = [
+            instruction
+            for index, instruction in enumerate(instructions)
+            if reachable[index] or instruction.opcode == "LABEL"
+        ]
+        if len(kept) < len(instructions):
+            self.removed += len(instructions) - len(kept)
+            self.program.relink(kept)
+
+    # fuses the sequences of instructions from the start of the program
+    def _fuse_sequences(self):
+        # a label can not be inside a sequence, so only its first instruction is ever jumped to
+        instructions = self.program.instructions
+        index = 0
+        while index < len(instructions):
+            length = self._fuse_sequence(instructions, index)
+            if length > 1:
+                self.fused += 1
+            index += length
+
+    # fuses the sequence starting at the index if it is known, returns its length
+    def _fuse_sequence(self, instructions, index):
+        first = instructions[index]
+        following = instructions[index + 1 : index + 3]
+
+        # a specialized handler without checks is faster than a fused one with them
+        if first in self.checked:
+            return 1
+        second = following[0].opcode if following else None
+
+        if first.opcode == "CREATEFRAME":
+            if second == "PUSHFRAME":
+                if len(following) > 1 and following[1].opcode == "CALL":
+                    return self._fuse(first, Instruction._do_createframe_pushframe_call, following)
+                return self._fuse(first, Instruction._do_createframe_pushframe, following[:1])
+
+            defvars = self._temporary_defvars(instructions, index + 1)
+            if defvars:
+                return self._fuse(first, Instruction._do_createframe_defvars, defvars)
+        elif first.opcode == "DEFVAR":
+            if second == "MOVE" and following[0].op1 is first.op1:
+                return self._fuse(first, Instruction._do_defvar_move, following[:1])
+
+            defvars = self._defvars(instructions, index + 1)
+            if defvars:
+                return self._fuse(first, Instruction._do_defvars, defvars)
+        elif first.opcode == "PUSHS":
+            if second == "POPS":
+                return self._fuse(first, Instruction._do_pushs_pops, following[:1])
+        elif first.opcode in self.RELATIONS:
+            if second in self.JUMPS:
+                branch_on = self._branch_on(first, following[0])
+                if branch_on is not None:
+                    return self._fuse(
+                        first, Instruction._do_relation_jump, following[:1], branch_on
+                    )
+        elif first.opcode == "POPFRAME":
+            if second == "RETURN":
+                return self._fuse(first, Instruction._do_popframe_return, following[:1])
+
+        return 1
+
+    # fuses the first instruction with the following ones, returns the length of the sequence
+    def _fuse(self, first, handler, following, branch_on=None):
+        first.fuse(handler, following, branch_on)
+        return len(first.sequence)
+
+    # returns the DEFVAR instructions following the index
+    def _defvars(self, instructions, index):
+        defvars = []
+        while index < len(instructions) and instructions[index].opcode == "DEFVAR":
+            defvars.append(instructions[index])
+            index += 1
+        return defvars
+
+    # returns the DEFVAR instructions of temporary variables following the index
+    def _temporary_defvars(self, instructions, index):
+        defvars = []
+        for defvar in self._defvars(instructions, index):
+            if defvar.op1[0] != TEMPORARY:
+                break
+            defvars.append(defvar)
+        return defvars
+
+    # returns the result of the relation taking the jump, or None if the jump does not test it
+    def _branch_on(self, relation, jump):
+        if jump.op2 is relation.op1 and jump.op3_type == "bool":
+            literal = jump.op3
+        elif jump.op3 is relation.op1 and jump.op2_type == "bool":
+            literal = jump.op2
+        else:
+            return None
+
+        if jump.opcode == "JUMPIFEQ":
+            return literal.value
+        return not literal.value
+
+    # selects the handlers without checks for the instructions whose operand types are proven
+    def _specialize(self):
+        analyzer = Analyzer(self.program)
+        analyzer.analyze()
+        for instruction, types in analyzer.states():
+            handler = self._specialized_handler(instruction, analyzer, types)
+            if handler is not None:
+                instruction.specialize(handler)
+                self.checked.add(instruction)
+                self.specialized += 1
+
+    # returns the specialized handler of the instruction if its checks can not fail, otherwise None
+    def _specialized_handler(self, instruction, analyzer, types):
+        opcode = instruction.opcode
+        handler = Instruction.SPECIALIZED.get(opcode)
+        if handler is None:
+            return None
+
+        # only the global variables keep their cells
+        for op, op_type in (
+            (instruction.op1, instruction.op1_type),
+            (instruction.op2, instruction.op2_type),
+            (instruction.op3, instruction.op3_type),
+        ):
+            if op_type == "var" and op[0] != GLOBAL:
+                return None
+
+        if opcode not in self.JUMPS and types[instruction.op1[1]] & UNDEFINED:
+            return None
+
+        type1 = analyzer.operand_types(instruction.op2, instruction.op2_type, types)
+        type2 = analyzer.operand_types(instruction.op3, instruction.op3_type, types)
+        if opcode == "MOVE":
+            proven = type1 & ~SET == 0
+        elif opcode in self.COMPARED_TYPES:
+            proven = type1 == type2 and type1 in self.COMPARED_TYPES[opcode]
+        elif opcode in ("NOT", "STRLEN"):
+            proven = type1 == self.OPERAND_TYPES[opcode]
+        else:
+            proven = type1 == type2 == self.OPERAND_TYPES[opcode]
+
+        return handler if proven else None
@@ -0,0 +1,164 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import json
+import sys
+import time
+from status import *
+from instruction import *
+
+"""
+Profiler objects run the program in their own loop, which measures every executed instruction.
+The counts and times are kept per instruction and summed per opcode and per function,
+a function is the code executed after a CALL of its label until the matching RETURN.
+The interpreter loop without profiling stays unchanged.
+"""
+
+
+class Profiler:
+    TOP = 10  # number of rows of each table printed to the standard error output
+    MAIN = "<main>"  # name of the code outside of the functions
+
+    def __init__(self, program, top=None):
+        self.program = program  # program being profiled
+        self.top = self.TOP if top is None else top  # number of rows of each table
+        self.counts = [0] * len(program.instructions)  # executions of each instruction
+        self.times = [0.0] * len(program.instructions)  # seconds spent in each instruction
+        self.functions = {}  # maps the names of functions to their calls, count and time
+        self.elapsed = 0.0  # seconds spent in the whole program
+
+        # maps the index following a label to the name of the label
+        self.entries = {index: name for name, index in program.labels.items()}
+
+    # runs the program by the VM and measures each instruction
+    def run(self, vm):
+        instructions = self.program.instructions
+        count = len(instructions)
+        counts = self.counts
+        times = self.times
+        call_stack = vm.call_stack
+        clock = time.perf_counter
+
+        # the function executing the current instruction is at the top
+        stack = [self._function(self.MAIN)]
+        function = stack[-1]
+
+        index = 0
+        running = None
+        started = clock()
+        try:
+            while index < count:
+                depth = len(call_stack)
+                running = index
+                start = clock()
+                next_index = instructions[index].execute(vm)
+                elapsed = clock() - start
+                running = None
+
+                counts[index] += 1
+                times[index] += elapsed
+                function[1] += 1
+                function[2] += elapsed
+
+                # CALL pushes and RETURN pops the call stack, also inside fused instructions
+                if len(call_stack) > depth:
+                    function = self._function(self.entries.get(next_index, "?"))
+                    function[0] += 1
+                    stack.append(function)
+                elif len(call_stack) < depth and len(stack) > 1:
+                    stack.pop()
+                    function = stack[-1]
+                elif instructions[index].tail_call:
+                    # a tail call replaces the function returning to the same place
+                    function = self._function(self.entries.get(next_index, "?"))
+                    function[0] += 1
+                    stack[-1] = function
+
+                index = next_index
+        finally:
+            # the instruction terminating the program is measured as well
+            if running is not None:
+                elapsed = clock() - start
+                counts[running] += 1
+                times[running] += elapsed
+                function[1] += 1
+                function[2] += elapsed
+            self.elapsed = clock() - started
+
+    # returns the calls, count and time of the function
+    def _function(self, name):
+        function = self.functions.get(name)
+        if function is None:
+            function = self.functions[name] = [0, 0, 0.0]
+        return function
+
+    # returns the name of the instruction, fused instructions are named by their sequence
+    def _name(self, instruction):
+        sequence = getattr(instruction, "sequence", None)
+        if sequence is None:
+            return instruction.opcode
+        return "+".join(part.opcode for part in sequence)
+
+    # returns the report as a dictionary
+    def report(self):
+        opcodes = {}
+        orders = []
+        for instruction in self.program.instructions:
+            count = self.counts[instruction.index]
+            if count == 0:
+                continue
+
+            name = self._name(instruction)
+            seconds = self.times[instruction.index]
+            stats = opcodes.setdefault(name, {"opcode": name, "count": 0, "time": 0.0})
+            stats["count"] += count
+            stats["time"] += seconds
+            orders.append(
+                {"order": instruction.order, "opcode": name, "count": count, "time": seconds}
+            )
+
+        functions = [
+            {"label": name, "calls": calls, "count": count, "time": seconds}
+            for name, (calls, count, seconds) in self.functions.items()
+        ]
+
+        return {
+            "instructions": sum(self.counts),
+            "time": self.elapsed,
+            "opcodes": sorted(opcodes.values(), key=lambda s: s["time"], reverse=True),
+            "orders": sorted(orders, key=lambda s: s["time"], reverse=True),
+            "functions": sorted(functions, key=lambda s: s["time"], reverse=True),
+        }
+
+    # writes the report to the JSON file and its top rows to the standard error output
+    def write(self, file):
+        report = self.report()
+        try:
+            with open(file, "w") as f:
+                json.dump(report, f, indent=2)
+        except OSError:
+            # the exit code of the program is kept
+            print(f"Unable to write the profile to {file}.", file=sys.stderr)
+
+        total = report["time"] or 1.0
+        lines = [f"Profile: {report['instructions']} instructions in {report['time']:.3f} s"]
+        tables = (
+            ("opcode", report["opcodes"], "opcode"),
+            ("order", report["orders"], "order"),
+            ("function", report["functions"], "label"),
+        )
+        for title, rows, key in tables:
+            lines.append("")
+            lines.append(f"{title:<24} {'count':>12} {'time [s]':>10} {'share':>7}")
+            for row in rows[: self.top]:
+                name = str(row[key])
+                if key == "order":
+                    name = f"{row['order']} {row['opcode']}"
+                lines.append(
+                    f"{name:<24} {row['count']:>12} {row['time']:>10.4f} "
+                    f"{100 * row['time'] / total:>6.1f}%"
+                )
+        print("\n".join(lines), file=sys.stderr)
@@ -0,0 +1,197 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import io
+from status import *
+from frame import *
+from instruction import *
+from reader import *
+from writer import *
+from vm import *
+
+"""
+Program objects hold the loaded instructions in a dense array sorted by order.
+The instruction's index in this array is used as the program counter.
+Variables are resolved to slots, local and temporary variables share the slots as TF becomes LF.
+A loaded program can be run many times in one process, each run gets its own VM with its input
+and output, so the runs can overlap in threads or run one inside another.
+"""
+
+
+class Result:
+    def __init__(self, stdout, code, error):
+        self.stdout = stdout  # bytes written by the program, None if it wrote to a given stream
+        self.code = code  # exit code of the program
+        self.error = error  # message of the error that ended the program or None
+
+
+class Program:
+    def __init__(self, instructions=()):
+        self.instructions = []  # instructions sorted by order
+        self.indices = {}  # maps instruction order to its index in the array
+        self.place(instructions)
+
+        self.global_slots = {}  # maps the names of global variables to their slots
+        self.local_slots = {}  # maps the names of local and temporary variables to their slots
+        self.variables = {}  # maps the names of variables to their resolved tuples
+        self.labels = {}  # maps the names of labels to the index following the label
+        self.constants = []  # pool of the constant cells of the literals, each one is stored once
+        self.constant_indices = {}  # maps the types and values of the literals to their indices
+        self.compiled = None  # function of the compiled program, it runs instead of the instructions
+
+    # places the loaded instructions into the array sorted by order
+    def place(self, instructions):
+        self.instructions = sorted(instructions, key=lambda i: i.order)
+        self._index()
+
+    # resolves the variables and creates the labels of newly loaded instructions
+    def link(self):
+        for instruction in self.instructions:
+            instruction.resolve_vars(self)
+
+        self._create_labels()
+        self._resolve_targets()
+
+    # assigns the instructions their indices in the array
+    def _index(self):
+        self.indices = {}
+        for index, instruction in enumerate(self.instructions):
+            instruction.index = index
+            self.indices[instruction.order] = index
+
+    # replaces the instructions by the optimized array and creates the labels again
+    def relink(self, instructions):
+        self.instructions = instructions
+        self._index()
+        self._create_labels()
+        self._resolve_targets()
+
+    # creates the labels, a label is the index of the instruction following it
+    def _create_labels(self):
+        self.labels = {}
+        for instruction in self.instructions:
+            instruction.create_labels(self.labels)
+
+    # stores the indices of their labels in the jumps and calls, undefined labels are reported here
+    def _resolve_targets(self):
+        instructions = self.instructions
+        for index, instruction in enumerate(instructions):
+            instruction.resolve_target(self.labels)
+            if instruction.opcode == "CALL":
+                following = [following.opcode for following in instructions[index + 1 : index + 3]]
+                instruction.bind_tail_call(following)
+
+    # resolves the variable name to a tuple of the frame kind, the slot and the name
+    def resolve_var(self, name):
+        var = self.variables.get(name)
+        if var is not None:
+            return var
+
+        if name is None or name[2:3] != "@" or name[:2] not in FRAME_KINDS:
+            exit_program(Status.INVALID_XML_ERR, "Expected frame name in variable name.")
+
+        kind = FRAME_KINDS[name[:2]]
+        slots = self.global_slots if kind == GLOBAL else self.local_slots
+        slot = slots.setdefault(name[3:], len(slots))
+
+        # every occurrence of the variable shares one tuple
+        var = (kind, slot, name)
+        self.variables[name] = var
+        return var
+
+    # returns the index of the literal in the constant pool, it is added if it is not there
+    def constant_index(self, cell):
+        # the type is a part of the key, since 1 and True are equal in Python
+        key = (cell.type, cell.value)
+        index = self.constant_indices.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(cell)
+            self.constant_indices[key] = index
+        return index
+
+    # returns the cell of the constant pool with the same type and value as the literal
+    def resolve_constant(self, cell):
+        return self.constants[self.constant_index(cell)]
+
+    # returns the linked program as a tuple of plain values, see restore
+    def dump(self):
+        # the instructions are dumped first, since they add the folded constants to the pool
+        records = [instruction.dump(self) for instruction in self.instructions]
+        return (
+            records,
+            [(cell.value, cell.type) for cell in self.constants],
+            self.global_slots,
+            self.local_slots,
+            self.labels,
+        )
+
+    # creates a linked program from the tuple returned by dump
+    @classmethod
+    def restore(cls, data):
+        records, constants, global_slots, local_slots, labels = data
+        constants = [Var(value, var_type) for value, var_type in constants]
+        program = cls([Instruction.restore(record, constants) for record in records])
+        program.constants = constants
+        program.constant_indices = {(cell.type, cell.value): i for i, cell in enumerate(constants)}
+        program.global_slots = global_slots
+        program.local_slots = local_slots
+        program.labels = labels
+        program._resolve_targets()
+        return program
+
+    # runs the program reading the input (bytes, a file path, a binary stream or a Reader) and
+    # writing to the output (a binary stream or a Writer), errors and EXIT end only the run and are
+    # given by the result, an unexpected exception of the interpreter is given as an internal error,
+    # runner is a function running the program by the VM instead of the compiled program or the loop
+    def run(self, inputs=b"", output=None, runner=None):
+        if isinstance(inputs, bytes):
+            inputs = io.BytesIO(inputs)
+        if not isinstance(inputs, Reader):
+            inputs = Reader(inputs)
+        buffer = io.BytesIO() if output is None else None
+        if not isinstance(output, Writer):
+            output = Writer(output if buffer is None else buffer)
+        if runner is None:
+            runner = self.compiled or self._loop
+
+        code = Status.OK.value
+        error = None
+        try:
+            try:
+                runner(VM(self, inputs, output))
+                output.close()
+            except ProgramExit as e:
+                # a failed write replaces only the exit code 0
+                output.close(e.code == Status.OK.value)
+                raise
+            finally:
+                # an unexpected exception flushes the output too, closing it again does nothing
+                output.close(False)
+                inputs.close()
+        except ProgramExit as e:
+            code = e.code
+            error = e.msg
+        except Exception as e:
+            # an embedding program gets a result even when the interpreter fails
+            code = Status.INTERNAL_ERR.value
+            error = f"Internal error: {e!r}"
+        return Result(None if buffer is None else buffer.getvalue(), code, error)
+
+    # interprets the instructions, the program counter is an index into the sorted array
+    def _loop(self, vm):
+        instructions = self.instructions
+        count = len(instructions)
+        index = 0
+        while index < count:
+            index = instructions[index].execute(vm)
+
+    # returns the instruction with the given order or None
+    def find_instruction(self, order):
+        index = self.indices.get(order)
+        if index is None:
+            return None
+        return self.instructions[index]
@@ -0,0 +1,61 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import sys
+
+"""
+Reader objects serve the lines of the --input file (or the standard input) to the READ instruction.
+The file is opened lazily on the first read and consumed line by line, so it is never loaded as a whole.
+"""
+
+
+class Reader:
+    BUFFER_SIZE = 1 << 20  # size of the read buffer in bytes
+
+    def __init__(self, file, memory_map=False):
+        self.file = file  # path to the input file, sys.stdin or a binary stream
+        self.memory_map = memory_map  # map the input file into memory instead of buffering it
+        self.stream = None  # opened on the first read
+
+    # opens the input stream
+    def _open(self):
+        if self.file == sys.stdin:
+            self.stream = sys.stdin.buffer
+            return
+        if not isinstance(self.file, str):
+            self.stream = self.file
+            return
+
+        f = open(self.file, "rb", buffering=self.BUFFER_SIZE)
+        if self.memory_map:
+            # mmap is imported only when the input is mapped
+            import mmap
+
+            try:
+                self.stream = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file can not be mapped
+                self.stream = f
+            else:
+                f.close()
+        else:
+            self.stream = f
+
+    # returns the next line without the line terminator or None at the end of the input
+    def read_line(self):
+        if self.stream is None:
+            self._open()
+
+        line = self.stream.readline()
+        if not line:
+            return None
+        return line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+    # closes the input stream if it was opened here, a stream given by the caller stays open
+    def close(self):
+        if self.stream is not None and isinstance(self.file, str):
+            self.stream.close()
+        self.stream = None
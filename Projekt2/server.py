@@ -0,0 +1,216 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+from status import *
+from interpreter import *
+from textloader import *
+from optimizer import *
+
+"""
+Server objects run many programs without starting a new interpreter for each of them.
+A job is a program with its input, it is read as a frame of the standard input or of a Unix socket
+connection and run by a pool of worker processes, which have the modules imported already.
+Every job is answered by a frame with its output, error output and exit code.
+"""
+
+# a frame is the length of its JSON text as a 4-byte big-endian number followed by the text
+HEADER = struct.Struct(">I")
+
+
+# prepares a worker process, the server alone stops on SIGINT and SIGTERM
+def init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+# calls the function with the standard error output captured, returns its result,
+# the error output and the exit code, exit_program ends the function with its status
+def capture(function, *args):
+    errors = io.StringIO()
+    result = None
+    code = Status.OK.value
+    with contextlib.redirect_stderr(errors):
+        try:
+            result = function(*args)
+        except ProgramExit as e:
+            if e.msg is not None:
+                print(e.msg, file=sys.stderr)
+            code = e.code
+        except Exception as e:
+            print(f"Internal error: {e!r}", file=sys.stderr)
+            code = Status.INTERNAL_ERR.value
+    return result, errors.getvalue(), code
+
+
+# runs a loaded program reading the input and writing to the output binary stream,
+# the error of the program ends the function like exit_program
+def run_program(program, inputs, output):
+    result = program.run(inputs, output)
+    if result.code != Status.OK.value:
+        raise ProgramExit(result.code, result.error)
+
+
+# loads the program of a job and runs it
+def _run_job(job, output):
+    interpreter = Interpreter(job.get("ippcode", False), job.get("optimize", False))
+    program = interpreter.load(job["source"].encode("utf-8"))
+    run_program(program, job.get("input", "").encode("utf-8"), output)
+
+
+# runs a job in a worker process and returns its response
+def run_job(job):
+    output = io.BytesIO()
+    _, errors, code = capture(_run_job, job, output)
+    return {
+        "id": job.get("id"),
+        "stdout": output.getvalue().decode("utf-8", "surrogatepass"),
+        "stderr": errors,
+        "code": code,
+    }
+
+
+class Server:
+    RECYCLE = 1000  # jobs run by a worker process before it is replaced
+
+    def __init__(self, workers=None, recycle=None):
+        self.workers = workers or os.cpu_count()  # number of worker processes
+        self.recycle = recycle or self.RECYCLE  # jobs run by a worker process before it is replaced
+        self.pool = None  # pool of the worker processes
+
+    # serves the jobs of the standard input or of the Unix socket until the end
+    def serve(self, path=None):
+        self.pool = multiprocessing.Pool(
+            self.workers, initializer=init_worker, maxtasksperchild=self.recycle
+        )
+        try:
+            if path is None:
+                # new workers are forked while the streams are in use, and they close
+                # sys.stdin and flush sys.stdout, so the server uses its own objects
+                with open(sys.stdin.fileno(), "rb", closefd=False) as reader, open(
+                    sys.stdout.fileno(), "wb", closefd=False
+                ) as writer:
+                    self._connection(reader, writer)
+            else:
+                self._listen(path)
+        except KeyboardInterrupt:
+            # the jobs in progress are abandoned
+            self.pool.terminate()
+        else:
+            self.pool.close()
+        self.pool.join()
+
+    # accepts the connections of the Unix socket, each of them is served by its own thread
+    def _listen(self, path):
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        # SIGTERM stops the server like SIGINT, so the socket file is removed
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            listener.bind(path)
+            listener.listen()
+            while True:
+                connection, _ = listener.accept()
+                thread = threading.Thread(
+                    target=self._socket, args=(connection,), daemon=True
+                )
+                thread.start()
+        finally:
+            listener.close()
+            os.unlink(path)
+
+    # serves a connection of the Unix socket
+    def _socket(self, connection):
+        with connection, connection.makefile("rb") as reader, connection.makefile(
+            "wb"
+        ) as writer:
+            self._connection(reader, writer)
+
+    # reads the jobs of a connection and writes their responses in the order they finish
+    def _connection(self, reader, writer):
+        # only the number of the jobs in progress is kept, so a long connection does not grow
+        finished = threading.Condition()
+        pending = 0
+
+        def respond(response):
+            data = json.dumps(response).encode("utf-8")
+            with finished:
+                try:
+                    writer.write(HEADER.pack(len(data)) + data)
+                    writer.flush()
+                except OSError:
+                    pass
+
+        # answers a finished job and forgets it
+        def done(response):
+            nonlocal pending
+            respond(response)
+            with finished:
+                pending -= 1
+                finished.notify_all()
+
+        # run_job catches the errors of the job, so only a lost worker ends it by an exception
+        def failed(job_id, error):
+            done(
+                {
+                    "id": job_id,
+                    "stdout": "",
+                    "stderr": f"Internal error: {error!r}",
+                    "code": Status.INTERNAL_ERR.value,
+                }
+            )
+
+        while True:
+            job = self._read_frame(reader)
+            if job is None:
+                break
+            if not isinstance(job, dict) or not isinstance(job.get("source"), str):
+                respond(
+                    {
+                        "id": job.get("id") if isinstance(job, dict) else None,
+                        "stdout": "",
+                        "stderr": "Invalid job.",
+                        "code": Status.INTERNAL_ERR.value,
+                    }
+                )
+                continue
+            with finished:
+                pending += 1
+            self.pool.apply_async(
+                run_job,
+                (job,),
+                callback=done,
+                error_callback=lambda error, job_id=job.get("id"): failed(job_id, error),
+            )
+
+        # the connection is closed after all of its jobs are answered
+        with finished:
+            finished.wait_for(lambda: pending == 0)
+
+    # returns the job of the next frame or None at the end of the stream
+    def _read_frame(self, reader):
+        header = reader.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        (size,) = HEADER.unpack(header)
+        data = reader.read(size)
+        if len(data) < size:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return {}
@@ -1,33 +1,53 @@
-"""
-IPP - Project 2
-Author: Roman Janota
-Date: 16-04-2023
-"""
-
-import sys
-from enum import Enum
-
-
-# enum for exit codes
-class Status(Enum):
-    OK = 0
-    MISSING_PARAM_ERR = 10
-    INPUT_FILE_ERR = 11
-    OUTPUT_FILE_ERR = 12
-    MALFORMED_ERR = 31
-    INVALID_XML_ERR = 32
-    SEMTANTIC_ERR = 52
-    MISMATCHED_TYPES_ERR = 53
-    VAR_NOT_EXIST_ERR = 54
-    FRAME_NOT_EXIST_ERR = 55
-    MISSING_VALUE_ERR = 56
-    VALUE_ERR = 57
-    STRING_ERR = 58
-    INTERNAL_ERR = 99
-
-
-# prints the message and terminates the program with the status value
-def exit_program(status, msg):
-    if msg is not None:
-        print(msg, file=sys.stderr)
-    exit(status.value)
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import sys
+from enum import Enum
+
+
+# enum for exit codes
+class Status(Enum):
+    OK = 0
+    MISSING_PARAM_ERR = 10
+    INPUT_FILE_ERR = 11
+    OUTPUT_FILE_ERR = 12
+    HEADER_ERR = 21
+    OPCODE_ERR = 22
+    LEXICAL_ERR = 23
+    MALFORMED_ERR = 31
+    INVALID_XML_ERR = 32
+    SEMTANTIC_ERR = 52
+    MISMATCHED_TYPES_ERR = 53
+    VAR_NOT_EXIST_ERR = 54
+    FRAME_NOT_EXIST_ERR = 55
+    MISSING_VALUE_ERR = 56
+    VALUE_ERR = 57
+    STRING_ERR = 58
+    INTERNAL_ERR = 99
+
+
+# the end of the program by an error or by EXIT with its exit code and message,
+# the interpreter raises it instead of terminating the process, so it can be embedded
+class ProgramExit(Exception):
+    def __init__(self, code, msg=None):
+        super().__init__(code, msg)
+        self.code = code  # exit code of the program
+        self.msg = msg  # message for the standard error output or None
+
+
+# ends the program with the status value and the message
+def exit_program(status, msg):
+    raise ProgramExit(status.value, msg)
+
+
+# runs the main function of a script, prints the message of its end and terminates the process
+def run_main(main):
+    try:
+        main()
+    except ProgramExit as e:
+        if e.msg is not None:
+            print(e.msg, file=sys.stderr)
+        sys.exit(e.code)
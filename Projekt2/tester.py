@@ -0,0 +1,229 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from status import *
+from interpreter import *
+from optimizer import *
+from server import *
+
+"""
+Tester objects run the test cases of a directory tree in a pool of worker processes.
+A test case is a source file name.src with the optional files name.in, name.out and name.rc,
+tests with the same source are run by one worker, which loads their program only once.
+The results are printed as a summary and written as JUnit XML or JSON reports.
+"""
+
+
+# loads the program of a test case
+def load_program(source, optimize):
+    return Interpreter(optimize=optimize).load(source)
+
+
+# runs the tests sharing a source in a worker process and returns their results
+def run_tests(tests, optimize):
+    start = time.perf_counter()
+    program, load_errors, load_code = capture(load_program, tests[0]["source"], optimize)
+    load_time = time.perf_counter() - start
+
+    results = []
+    for test in tests:
+        start = time.perf_counter()
+        output = io.BytesIO()
+        if program is None:
+            # the program can not be loaded, so every test gets the error of loading
+            errors, code = load_errors, load_code
+        else:
+            inputs = test["input"] if test["input"] is not None else io.BytesIO()
+            _, errors, code = capture(run_program, program, inputs, output)
+
+        # the time of loading is added to the first test of the source
+        results.append(
+            {
+                "name": test["name"],
+                "stdout": output.getvalue(),
+                "stderr": errors,
+                "code": code,
+                "time": time.perf_counter() - start + load_time,
+            }
+        )
+        load_time = 0.0
+    return results
+
+
+class Tester:
+    def __init__(self, directory, processes=None, optimize=False):
+        self.directory = directory  # root of the directory tree of the tests
+        self.processes = processes or os.cpu_count()  # number of worker processes
+        self.optimize = optimize  # run the optimized programs
+        self.results = []  # results of the tests sorted by their names
+        self.elapsed = 0.0  # seconds spent running the tests
+
+    # finds the test cases in the directory tree
+    def discover(self):
+        tests = []
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            for file in sorted(files):
+                if not file.endswith(".src"):
+                    continue
+                base = os.path.join(root, file[:-4])
+                tests.append(
+                    {
+                        "name": os.path.relpath(base, self.directory),
+                        "source": base + ".src",
+                        "input": self._optional(base + ".in"),
+                        "expected_stdout": self._read(base + ".out", b""),
+                        "expected_code": int(self._read(base + ".rc", b"0").strip() or 0),
+                    }
+                )
+        return tests
+
+    # returns the path if the file exists, None otherwise
+    def _optional(self, path):
+        return path if os.path.isfile(path) else None
+
+    # returns the content of the file or the default if it does not exist
+    def _read(self, path, default):
+        if not os.path.isfile(path):
+            return default
+        with open(path, "rb") as f:
+            return f.read()
+
+    # runs the tests and compares their results with the expected ones
+    def run(self):
+        start = time.perf_counter()
+
+        # the tests are grouped by the content of their sources,
+        # the workers get only the paths and the expected results stay here
+        tests = {}
+        groups = {}
+        for test in self.discover():
+            tests[test["name"]] = test
+            with open(test["source"], "rb") as f:
+                digest = hashlib.sha256(f.read()).digest()
+            job = {"name": test["name"], "source": test["source"], "input": test["input"]}
+            groups.setdefault(digest, []).append(job)
+
+        results = []
+        with multiprocessing.Pool(self.processes, initializer=init_worker) as pool:
+            jobs = [(group, self.optimize) for group in groups.values()]
+            for group in pool.starmap(run_tests, jobs, chunksize=8):
+                for result in group:
+                    result = dict(tests[result["name"]], **result)
+                    result["message"] = self._compare(result)
+                    results.append(result)
+
+        self.results = sorted(results, key=lambda result: result["name"])
+        self.elapsed = time.perf_counter() - start
+        return self.failures() == 0
+
+    # returns the reason why the test failed or None if it passed
+    def _compare(self, result):
+        if result["code"] != result["expected_code"]:
+            return f"Expected exit code {result['expected_code']}, got {result['code']}."
+
+        # the output is compared only if the program ends successfully
+        if result["code"] == 0 and result["stdout"] != result["expected_stdout"]:
+            return "The output differs from the expected one."
+        return None
+
+    # returns the number of failed tests
+    def failures(self):
+        return sum(1 for result in self.results if result["message"] is not None)
+
+    # returns the failed tests and the numbers of tests as text
+    def summary(self):
+        lines = []
+        for result in self.results:
+            if result["message"] is not None:
+                lines.append(f"FAILED {result['name']}: {result['message']}")
+        passed = len(self.results) - self.failures()
+        lines.append(f"Passed {passed} of {len(self.results)} tests in {self.elapsed:.2f} s.")
+        return "\n".join(lines)
+
+    # writes the results in the JSON format
+    def write_json(self, file):
+        report = {
+            "tests": len(self.results),
+            "failures": self.failures(),
+            "time": self.elapsed,
+            "results": [
+                {
+                    "name": result["name"],
+                    "passed": result["message"] is None,
+                    "message": result["message"],
+                    "expected_code": result["expected_code"],
+                    "code": result["code"],
+                    "time": result["time"],
+                    "stderr": result["stderr"],
+                }
+                for result in self.results
+            ],
+        }
+        with open(file, "w") as f:
+            json.dump(report, f, indent=2)
+
+    # writes the results in the JUnit XML format
+    def write_junit(self, file):
+        suite = ET.Element(
+            "testsuite",
+            name="interpret",
+            tests=str(len(self.results)),
+            failures=str(self.failures()),
+            errors="0",
+            time=f"{self.elapsed:.3f}",
+        )
+        for result in self.results:
+            directory, name = os.path.split(result["name"])
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname=directory.replace(os.sep, ".") or ".",
+                name=name,
+                time=f"{result['time']:.6f}",
+            )
+            if result["message"] is not None:
+                failure = ET.SubElement(case, "failure", message=result["message"])
+                failure.text = result["stderr"]
+        ET.ElementTree(suite).write(file, encoding="utf-8", xml_declaration=True)
+
+
+def main():
+    # parse arguments
+    parser = argparse.ArgumentParser(description="Tester of the IPPcode23 interpreter.")
+    parser.add_argument("directory", help="Directory tree with the test cases.")
+    parser.add_argument(
+        "--processes", type=int, help="Number of worker processes, the number of CPUs by default."
+    )
+    parser.add_argument("--optimize", action="store_true", help="Run the optimized programs.")
+    parser.add_argument("--junit", help="File for the JUnit XML report.")
+    parser.add_argument("--json", help="File for the JSON report.")
+    args = vars(parser.parse_args())
+
+    if not os.path.isdir(args["directory"]):
+        exit_program(Status.INPUT_FILE_ERR, "Unable to open the test directory.")
+
+    tester = Tester(args["directory"], args["processes"], args["optimize"])
+    passed = tester.run()
+    print(tester.summary())
+    if args["junit"] is not None:
+        tester.write_junit(args["junit"])
+    if args["json"] is not None:
+        tester.write_json(args["json"])
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    run_main(main)
@@ -0,0 +1,134 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import io
+import re
+import sys
+from status import *
+from instruction import *
+from program import *
+
+"""
+TextLoader objects read the IPPcode23 source text directly, without the XML produced by parse.php.
+Each line is checked by the same rules as parse.php uses, and the instruction is created
+straight from the checked operands, without building the XML element parse.php would generate.
+"""
+
+# names of variables and labels
+IDENTIFIER = r"[A-Za-z_\-$&%*!?][A-Za-z0-9_\-$&%*!?]*"
+VAR_RE = re.compile(rf"(GF|LF|TF)@{IDENTIFIER}")
+LABEL_RE = re.compile(IDENTIFIER)
+# decimal, hexadecimal, octal and binary integers with an optional sign
+INT_RE = re.compile(r"[+-]?(0[xX][0-9A-Fa-f]+|0[oO][0-7]+|0[bB][01]+|[0-9]+)")
+# every backslash in a string has to start an escape sequence of three digits
+STRING_RE = re.compile(r"([^\\]|\\\d{3})*")
+
+
+class TextLoader:
+    def __init__(self, source):
+        self.source = source  # path to the source file, sys.stdin or a binary stream
+        self.line_number = 0  # number of the line being read
+
+    # reports a lexical or syntax error on the current line
+    def _error(self, status, msg):
+        exit_program(status, f"{msg} on line {self.line_number}.")
+
+    # returns the type and the text of an operand of the given kind
+    def _operand(self, kind, arg):
+        if kind == "var":
+            if VAR_RE.fullmatch(arg) is None:
+                self._error(Status.LEXICAL_ERR, f"Invalid variable {arg}")
+            return "var", arg
+
+        if kind == "label":
+            if LABEL_RE.fullmatch(arg) is None:
+                self._error(Status.LEXICAL_ERR, f"Invalid label {arg}")
+            return "label", arg
+
+        if kind == "type":
+            if arg not in ("int", "string", "bool"):
+                self._error(Status.LEXICAL_ERR, f"Invalid type {arg}")
+            return "type", arg
+
+        # a symbol is either a variable or a literal
+        if VAR_RE.fullmatch(arg) is not None:
+            return "var", arg
+
+        op_type, at, value = arg.partition("@")
+        if not at or op_type not in LITERAL_TYPES:
+            self._error(Status.LEXICAL_ERR, f"Invalid symbol {arg}")
+        if op_type == "int" and value == "":
+            self._error(Status.LEXICAL_ERR, f"Empty integer {arg}")
+        if op_type == "int" and INT_RE.fullmatch(value) is None:
+            self._error(Status.LEXICAL_ERR, f"Invalid integer {arg}")
+        if op_type == "bool" and value not in ("true", "false"):
+            self._error(Status.LEXICAL_ERR, f"Invalid boolean value {arg}")
+        if op_type == "nil" and value != "nil":
+            self._error(Status.LEXICAL_ERR, f"Invalid use of nil {arg}")
+        if op_type == "string" and STRING_RE.fullmatch(value) is None:
+            self._error(Status.LEXICAL_ERR, f"Invalid string {arg}")
+        return op_type, value
+
+    # creates the instruction of a line from its checked operands
+    def _instruction(self, words, order):
+        opcode = words[0].upper()
+        kinds = Instruction.OPERANDS.get(opcode)
+        if kinds is None:
+            self._error(Status.OPCODE_ERR, f"Unknown opcode {words[0]}")
+        if len(words) - 1 != len(kinds):
+            self._error(Status.LEXICAL_ERR, f"Invalid number of operands of {opcode}")
+
+        operands = [self._operand(kind, arg) for kind, arg in zip(kinds, words[1:])]
+        return Instruction.from_operands(order, opcode, operands)
+
+    # opens the source as a text stream
+    def _open(self):
+        if self.source == sys.stdin:
+            return sys.stdin
+        if isinstance(self.source, str):
+            return open(self.source, encoding="utf-8")
+        return io.TextIOWrapper(self.source, encoding="utf-8")
+
+    # reads the source and returns the loaded program
+    def load(self):
+        # the literals are pooled while the lines are read, so equal ones are stored once
+        program = Program()
+        instructions = []
+        header = False
+        stream = self._open()
+        try:
+            for line in stream:
+                self.line_number += 1
+
+                # strip the comment and split by white spaces
+                words = line.split("#", 1)[0].split()
+                if not words:
+                    continue
+
+                if not header:
+                    if len(words) != 1 or words[0].lower() != ".ippcode23":
+                        self._error(Status.HEADER_ERR, "Invalid header")
+                    header = True
+                    continue
+
+                instruction = self._instruction(words, len(instructions) + 1)
+                instruction.resolve_constants(program)
+                instructions.append(instruction)
+        except UnicodeDecodeError:
+            self._error(Status.LEXICAL_ERR, "Invalid character")
+        finally:
+            if isinstance(self.source, str):
+                stream.close()
+            elif stream != sys.stdin:
+                # a binary stream given by the caller stays open
+                stream.detach()
+
+        if not header:
+            exit_program(Status.HEADER_ERR, "Missing header.")
+
+        program.place(instructions)
+        program.link()
+        return program
@@ -0,0 +1,78 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+from status import *
+from frame import *
+from array import array
+
+"""
+VM objects hold the state of a single run of a program, the frames, the stacks, the input and
+the output. Every run creates its own VM and the instruction handlers get it as their argument,
+so the instructions of a loaded program keep no state of a run and programs can run in parallel
+threads or one inside another.
+"""
+
+
+class VM:
+    FREE_FRAMES_LIMIT = 64  # Maximum number of recycled local frames
+
+    def __init__(self, program, inputs, output):
+        self.frames = [Frame(len(program.global_slots)), None, None]  # GF, top of LF and TF
+        self.local_size = len(program.local_slots)  # Number of slots in a local or temporary frame
+        self.LF = []  # Local frame stack, its top is the last item
+        self.free_frames = []  # Recycled local frames
+        self.stack = []  # IPPcode23 instruction's stack of native values, its top is the last item
+        self.call_stack = array("q")  # Function call stack of return indices, top is the last item
+        self.inputs = inputs  # Reader of the inputs for READ
+        self.output = output  # Writer of the output of WRITE
+        self.cells = [None] * len(program.instructions)  # operand cells of the specialized handlers
+
+    # reports an access to a frame that does not exist
+    def missing_frame(self, kind):
+        if kind == TEMPORARY:
+            exit_program(
+                Status.FRAME_NOT_EXIST_ERR,
+                "Attempted to access a temporary frame without creating it first.",
+            )
+        exit_program(
+            Status.FRAME_NOT_EXIST_ERR,
+            "Attempted to access a local frame without creating it first.",
+        )
+
+    # gets the cell of a resolved variable
+    def get_var(self, var):
+        frame = self.frames[var[0]]
+        if frame is None:
+            self.missing_frame(var[0])
+
+        cell = frame[var[1]]
+        if cell is None:
+            exit_program(Status.VAR_NOT_EXIST_ERR, f"Variable {var[2]} not defined.")
+        return cell
+
+    # sets the new value and type of a resolved variable
+    def set_var(self, var, value, var_type):
+        cell = self.get_var(var)
+        cell.value = value
+        cell.type = var_type
+
+    # gets the cell of a symbol, literals are constant cells decoded at load
+    def symbol(self, sym, sym_type):
+        if sym_type == "var":
+            return self.get_var(sym)
+        return sym
+
+    # gets an empty local frame, recycled frames are reused
+    def new_frame(self):
+        if self.free_frames:
+            return self.free_frames.pop()
+        return Frame(self.local_size)
+
+    # returns a discarded local frame to the free list
+    def release_frame(self, frame):
+        if frame is not None and len(self.free_frames) < self.FREE_FRAMES_LIMIT:
+            frame.clear_vars()
+            self.free_frames.append(frame)
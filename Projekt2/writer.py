@@ -0,0 +1,114 @@
+"""
+IPP - Project 2
+Author: Roman Janota
+Date: 16-04-2023
+"""
+
+import sys
+from status import *
+
+"""
+Writer objects buffer the output of the WRITE instruction.
+The buffered text is written to the standard output or to a file in large chunks,
+optionally by a background thread, so a slow consumer does not block the interpreter.
+"""
+
+
+class Writer:
+    BUFFER_SIZE = 1 << 16  # default number of buffered characters before a flush
+    QUEUE_SIZE = 16  # number of chunks the background thread may lag behind
+
+    def __init__(self, file=None, buffer_size=BUFFER_SIZE, threaded=False):
+        if file is None:
+            self.stream = sys.stdout.buffer
+            self.own_stream = False
+        elif not isinstance(file, str):
+            # a binary stream given by the caller stays open
+            self.stream = file
+            self.own_stream = False
+        else:
+            self.stream = open(file, "wb")
+            self.own_stream = True
+
+        self.buffer_size = buffer_size  # flush after this many characters
+        self.parts = []  # buffered text
+        self.size = 0  # number of buffered characters
+        self.error = None  # error raised while writing to the stream
+        self.closed = False  # everything was flushed and the stream was closed
+
+        self.queue = None  # chunks waiting for the background thread
+        self.thread = None  # the background writer thread
+        if threaded:
+            # the thread modules are imported only when the output is threaded
+            import queue
+            import threading
+
+            self.queue = queue.Queue(self.QUEUE_SIZE)
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    # appends the text to the buffer, the buffer is flushed when it is full
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    # hands the buffered text over to the stream or to the background thread
+    def flush(self):
+        if not self.parts:
+            return
+
+        data = "".join(self.parts).encode("utf-8", "surrogatepass")
+        self.parts.clear()
+        self.size = 0
+
+        if self.queue is not None:
+            # blocks when the background thread falls too far behind
+            self.queue.put(data)
+        else:
+            self._write(data)
+
+    # writes a chunk to the stream and remembers the first error
+    def _write(self, data):
+        if self.error is not None:
+            return
+        try:
+            self.stream.write(data)
+        except OSError as e:
+            self.error = e
+
+    # the background thread writes the chunks until it gets None
+    def _run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            self._write(data)
+            if self.queue.empty() and self.error is None:
+                try:
+                    self.stream.flush()
+                except OSError as e:
+                    self.error = e
+
+    # flushes everything and waits for the background thread, a failed write is reported
+    # unless report is False, so it does not replace the exit code of an error in progress
+    def close(self, report=True):
+        if not self.closed:
+            self.closed = True
+            self.flush()
+            if self.thread is not None:
+                self.queue.put(None)
+                self.thread.join()
+                self.thread = None
+
+            try:
+                self.stream.flush()
+                if self.own_stream:
+                    self.stream.close()
+            except OSError as e:
+                if self.error is None:
+                    self.error = e
+
+        if report and self.error is not None:
+            exit_program(Status.OUTPUT_FILE_ERR, "Unable to write the output.")